@@ -11,6 +11,15 @@ import fault.expression as expression
 
 
 class Action(ABC):
+    # the most common actions define __slots__ to keep them small, since
+    # test benches may create many of them.  subclasses that don't define
+    # __slots__ get a __dict__ as usual.
+    #
+    # actions compare and hash by identity.  they are mutable (e.g. GetValue
+    # is filled in after simulation) and their values may be expressions,
+    # for which == builds a new expression rather than returning a bool.
+    __slots__ = ()
+
     @abstractmethod
     def retarget(self, new_circuit, clock):
         """
@@ -23,6 +32,8 @@ class Action(ABC):
 
 
 class PortAction(Action):
+    __slots__ = ("port", "value")
+
     def __init__(self, port, value):
         super().__init__()
         self.port = port
@@ -41,6 +52,41 @@ class PortAction(Action):
         new_port = new_circuit.interface.ports[str(port.name)]
         return cls(new_port, self.value)
 
+    def clone_with(self, port, value):
+        """
+        Create a copy of the action with a new `port` and `value`.  All
+        other attributes are shared with the original action.
+        """
+        cls = type(self)
+        obj = cls.__new__(cls)
+        names, has_dict = _clone_attrs(cls)
+        for name in names:
+            setattr(obj, name, getattr(self, name))
+        if has_dict:
+            obj.__dict__.update(self.__dict__)
+        obj.port = port
+        obj.value = value
+        return obj
+
+
+# names of the slots other than "port" and "value", and whether instances
+# have a __dict__, for each action class, as used by clone_with
+_CLONE_ATTRS = {}
+
+
+def _clone_attrs(cls):
+    attrs = _CLONE_ATTRS.get(cls)
+    if attrs is None:
+        names = []
+        for klass in cls.__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                if name not in ('port', 'value', '__dict__', '__weakref__'):
+                    names.append(name)
+        has_dict = any('__dict__' in klass.__dict__
+                       for klass in cls.__mro__[:-1])
+        attrs = _CLONE_ATTRS[cls] = (tuple(names), has_dict)
+    return attrs
+
 
 def is_input(port):
     if isinstance(port, SelectPath):
@@ -52,6 +98,8 @@ def is_input(port):
 
 
 class Poke(PortAction):
+    __slots__ = ("delay",)
+
     def __init__(self, port, value, delay=None):
         if not isinstance(port, Var) and is_input(port):
             raise ValueError(f"Can only poke inputs: {port.debug_name} "
@@ -61,6 +109,8 @@ class Poke(PortAction):
 
 
 class Print(Action):
+    __slots__ = ("format_str", "ports")
+
     def __init__(self, format_str, *args):
         super().__init__()
         format_str = format_str.replace("\n", "\\n")
@@ -126,6 +176,8 @@ class GetValue(Action):
 
 
 class Expect(PortAction):
+    __slots__ = ("strict", "above", "below", "caller", "msg")
+
     def __init__(self, port, value, strict=False, abs_tol=None, rel_tol=None,
                  above=None, below=None, caller=None, msg=None):
         # call super constructor
@@ -182,6 +234,8 @@ class Guarantee(PortAction):
 
 
 class Peek(Action, expression.Expression):
+    __slots__ = ("port",)
+
     def __init__(self, port):
         super().__init__()
         self.port = port
@@ -196,6 +250,8 @@ class Peek(Action, expression.Expression):
 
 
 class Eval(Action):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
 
@@ -219,6 +275,8 @@ class Delay(Action):
 
 
 class Step(Action):
+    __slots__ = ("clock", "steps")
+
     def __init__(self, clock, steps):
         super().__init__()
         # TODO(rsetaluri): Check if `clock` is a clock type?
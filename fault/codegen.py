@@ -33,6 +33,12 @@ class CodeGenerator:
         for arg in args:
             self.print(f'{self.tab_count*self.tab}{arg}{self.nl}')
 
+    def println_lines(self, lines):
+        # print many lines at once, which is faster than calling
+        # println for each one
+        prefix = self.tab_count * self.tab
+        self.print(''.join(f'{prefix}{line}{self.nl}' for line in lines))
+
     def println_comma_sep(self, *args, indent=True):
         if indent:
             self.indent()
@@ -4,6 +4,8 @@ import pysv
 
 
 class Expression:
+    __slots__ = ()
+
     def __and__(self, other):
         return And(self, other)
 
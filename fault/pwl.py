@@ -1,4 +1,14 @@
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    print('Failed to import Numpy for PWL generation.')
+
+
 def pwc_to_pwl(pwc, t_stop, t_tr, init=0):
+    # Reference implementation operating on a list of (t, v) tuples.
+    # SpiceTarget uses pwc_to_pwl_vec instead, which does the same
+    # conversion with array operations.
+
     # add initial value if necessary
     if len(pwc) == 0 or pwc[0][0] != 0:
         pwc = pwc.copy()
@@ -19,3 +29,53 @@ def pwc_to_pwl(pwc, t_stop, t_tr, init=0):
 
     # return new waveform
     return retval
+
+
+def pwc_to_pwl_vec(t_arr, v_arr, t_stop, t_tr, init=0):
+    # Vectorized version of pwc_to_pwl that operates on parallel arrays
+    # of times and values.  The result is an N x 2 array whose rows are
+    # the (t, v) points of the piecewise-linear waveform, so it can be
+    # used anywhere a list of (t, v) tuples is expected.
+    t_arr = np.asarray(t_arr, dtype=float)
+    v_arr = np.asarray(v_arr, dtype=float)
+
+    # add initial value if necessary
+    if len(t_arr) == 0 or t_arr[0] != 0:
+        t_arr = np.concatenate(([0.0], t_arr))
+        v_arr = np.concatenate(([init], v_arr))
+
+    # each interior step becomes two points: the time of the step with
+    # the previous value, followed by the time of the step plus the
+    # transition time with the new value
+    n = len(t_arr)
+    retval = np.empty((2 * n, 2), dtype=float)
+    retval[0] = (t_arr[0], v_arr[0])
+    retval[1:-1:2, 0] = t_arr[1:]
+    retval[1:-1:2, 1] = v_arr[:-1]
+    retval[2:-1:2, 0] = t_arr[1:] + t_tr
+    retval[2:-1:2, 1] = v_arr[1:]
+
+    # add final value
+    retval[-1] = (t_stop, v_arr[-1])
+
+    # return new waveform
+    return retval
+
+
+def _float_str(value):
+    # shortest string that reads back as the same float, written without
+    # a trailing ".0" for whole numbers (e.g. "0" rather than "0.0")
+    text = repr(value)
+    return text[:-2] if text.endswith('.0') else text
+
+
+def pwl_str(pwl):
+    # Format a PWL waveform as a string of space-separated "t v" pairs.
+    # "pwl" can be either a list of (t, v) tuples or an N x 2 array as
+    # returned by pwc_to_pwl_vec.  In the latter case, the whole array is
+    # converted to a list of floats in a single operation rather than
+    # indexing it one point at a time.
+    if getattr(pwl, 'ndim', None) == 2:
+        return ' '.join(map(_float_str, pwl.ravel().tolist()))
+    else:
+        return ' '.join(f'{t} {v}' for t, v in pwl)
@@ -1,20 +1,36 @@
+import pickle
+from array import array
+from collections import defaultdict
+from pathlib import Path
+
 try:
     import numpy as np
-    from scipy.interpolate import interp1d
-    import decida.Data
 except ModuleNotFoundError:
     print('Failed to import libraries for results parsing.  Capabilities may be limited.')  # noqa
 
+# scipy and DeCiDa are slow to import and are only needed when SPICE results
+# are actually parsed, so they are imported in the functions that use them
+# rather than whenever fault is imported.
+
 
 class SpiceResult:
     def __init__(self, t, v):
         self.t = t
         self.v = v
+        from scipy.interpolate import interp1d
         self.func = interp1d(t, v, bounds_error=False, fill_value=(v[0], v[-1]))
 
     def __call__(self, t):
         return self.func(t)
 
+    # only the waveform data is pickled; the interpolator is rebuilt
+    # when unpickling
+    def __getstate__(self):
+        return {'t': self.t, 'v': self.v}
+
+    def __setstate__(self, state):
+        self.__init__(t=state['t'], v=state['v'])
+
 
 # temporary measure -- CSDF parsing is broken in
 # DeCiDa so a simple parser is implemented here
@@ -31,38 +47,53 @@ class CSDFData:
         return self._data[:, self._names[name]]
 
     def read(self, file):
-        # read in flat data vector
+        # the file is parsed a line at a time rather than read into memory
+        # as a whole, since it may be large
+        with open(file, 'rb') as f:
+            self.parse(f)
+
+    def parse(self, lines):
+        # "lines" is an iterable of the lines of the file, as bytes
+
+        # read in flat data vector.  the values are accumulated in a typed
+        # array rather than a list of floats, since there may be many of
+        # them.
         mode = None
-        data = []
-        with open(file, 'r') as f:
-            for line in f:
-                # determine mode
-                line = line.strip().split()
-                if not line:
-                    continue
-                elif line[0] == '#N':
-                    mode = '#N'
-                    line.pop(0)
-                elif line[0] == '#C':
-                    mode = '#C'
-                    line.pop(0)
-                    data.append(float(line.pop(0)))
-                    line.pop(0)
-                elif line[0] == '#;':
-                    break
-                # parse depending on mode
-                if mode == '#N':
-                    for tok in line:
-                        tok = tok[1:-1]
-                        self._names[tok] = len(self._names)
-                elif mode == '#C':
-                    for tok in line:
-                        data.append(float(tok))
-
-        # reshape into numpy array
+        data = array('d')
+        for line in lines:
+            # determine mode
+            line = line.split()
+            if not line:
+                continue
+            elif line[0] == b'#N':
+                mode = '#N'
+                del line[0]
+            elif line[0] == b'#C':
+                if len(line) < 3:
+                    raise ValueError('CSDF data ends in the middle of a "#C" '
+                                     'line; the results file may be '
+                                     'truncated.')
+                mode = '#C'
+                data.append(float(line[1]))
+                del line[:3]
+            elif line[0] == b'#;':
+                break
+            # parse depending on mode
+            if mode == '#N':
+                for tok in line:
+                    tok = tok[1:-1].decode()
+                    self._names[tok] = len(self._names)
+            elif mode == '#C':
+                data.extend(map(float, line))
+
+        # reshape into numpy array, which shares memory with "data"
         nv = len(self._names)
+        if len(data) % nv != 0:
+            raise ValueError(f'CSDF data has {len(data)} values, which is '
+                             f'not a multiple of the {nv} signals; the '
+                             f'results file may be truncated.')
         ns = len(data) // nv
-        data = np.array(data, dtype=float)
+        data = np.frombuffer(data, dtype=float)
         data = np.reshape(data, (ns, nv))
 
         # store using internal numpy array
@@ -70,12 +101,14 @@ class CSDFData:
 
 
 def nut_parse(nut_file, time='time'):
+    import decida.Data
     data = decida.Data.Data()
     data.read_nutmeg(f'{nut_file}')
     return data_to_interp(data=data, time=time)
 
 
 def psf_parse(psf_file, time='time'):
+    import decida.Data
     data = decida.Data.Data()
     data.read_psf(f'{psf_file}')
     return data_to_interp(data=data, time=time)
@@ -87,6 +120,34 @@ def hspice_parse(tr0_file, time='time'):
     return data_to_interp(data=data, time=time)
 
 
+def cached_parse(parse_func, raw_file):
+    # Parse "raw_file" with "parse_func", caching the parsed results in a
+    # pickle file next to the raw file.  The cache is keyed by the parser
+    # and the modification time and size of the raw file, so it is only
+    # used if the raw file hasn't changed since the results were cached.
+    raw_file = Path(raw_file)
+    cache_file = raw_file.with_name(raw_file.name + '.pkl')
+    stat = raw_file.stat()
+    key = (parse_func.__name__, stat.st_mtime_ns, stat.st_size)
+
+    # try to use the cached results
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'rb') as f:
+                cache_key, results = pickle.load(f)
+            if cache_key == key:
+                return results
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+    # otherwise parse the raw file and cache the results
+    results = parse_func(raw_file)
+    with open(cache_file, 'wb') as f:
+        pickle.dump((key, results), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return results
+
+
 def data_to_interp(data, time, strip_vi=True):
     retval = {}
 
@@ -116,3 +177,21 @@ def data_to_interp(data, time, strip_vi=True):
 
     # return results
     return retval
+
+
+def eval_results(results, names, times):
+    # Evaluate the waveforms "names" at the corresponding "times", where
+    # "names" and "times" are parallel sequences.  Lookups are grouped by
+    # waveform name so that each interpolator is only called once, with a
+    # vector of times, rather than once per lookup.  Returns an array of
+    # values in the same order as the inputs.
+    times = np.asarray(times, dtype=float)
+    idx_by_name = defaultdict(list)
+    for k, name in enumerate(names):
+        idx_by_name[name].append(k)
+
+    retval = np.empty(len(times), dtype=float)
+    for name, idx in idx_by_name.items():
+        retval[idx] = results[name](times[idx])
+
+    return retval
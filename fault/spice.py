@@ -1,4 +1,5 @@
 from fault.codegen import CodeGenerator
+from fault.pwl import pwl_str
 
 
 class SpiceNetlist(CodeGenerator):
@@ -89,8 +90,7 @@ class SpiceNetlist(CodeGenerator):
         if dc is not None:
             line += ['DC', f'{dc}']
         if pwl is not None:
-            pwl_str = ' '.join(f'{t} {v}' for t, v in pwl)
-            line += [f'PWL({pwl_str})']
+            line += [f'PWL({pwl_str(pwl)})']
 
         # print the line
         self.println(' '.join(line))
@@ -1,15 +1,19 @@
 import os
+import re
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from copy import copy
 import magma as m
 import fault
 import hwtypes
 from fault.target import Target
 from fault.spice import SpiceNetlist
 from fault.ms_types import RealInOut
-from fault.result_parse import nut_parse, hspice_parse, psf_parse
+from fault.result_parse import (nut_parse, hspice_parse, psf_parse,
+                                cached_parse, eval_results)
 from fault.subprocess_run import subprocess_run
-from fault.pwl import pwc_to_pwl
+from fault.pwl import pwc_to_pwl_vec, pwl_str
 from fault.actions import Poke, Expect, Delay, Print, GetValue, Eval
 from fault.select_path import SelectPath
 from .fault_errors import A2DError, ExpectError
@@ -31,6 +35,34 @@ class CompiledSpiceActions:
         self.gets = gets
 
 
+def parse_results(simulator, raw_file, cache=False):
+    if simulator in {'ngspice'}:
+        parse_func = nut_parse
+    elif simulator in {'spectre'}:
+        parse_func = psf_parse
+    elif simulator in {'hspice'}:
+        parse_func = hspice_parse
+    else:
+        raise NotImplementedError(simulator)
+
+    if cache:
+        return cached_parse(parse_func, raw_file)
+    else:
+        return parse_func(raw_file)
+
+
+def _run_sim_job(job):
+    # runs a single simulation for SpiceTarget.run_many and returns the
+    # parsed results.  defined at the module level so that it can be
+    # used with a ProcessPoolExecutor.
+    if not job['no_run']:
+        subprocess_run(job['cmd'], cwd=job['cwd'], env=job['env'],
+                       disp_type=job['disp_type'])
+    return [parse_results(job['simulator'], raw_file,
+                          cache=job['cache_results'])
+            for raw_file in job['raw_files']]
+
+
 def DeclareFromSpice(file_name, subckt_name=None, mode='digital'):
     # parse the netlist
     spice_model_path = Path(file_name).resolve()
@@ -68,6 +100,25 @@ def DeclareFromSpice(file_name, subckt_name=None, mode='digital'):
     return circuit
 
 
+# Bump this if the testbench format changes, so that templates
+# cached on disk by older versions are not reused
+TB_TEMPLATE_VERSION = 1
+
+# Markers for fields that are filled in when a testbench template is used
+FIELD_RE = re.compile('\x00([A-Z_0-9]+)\x00')
+
+# Format strings for the names of individual bus bits, by bus delimiter
+BUS_FORMATS = {
+    '<>': '{port}<{k}>',
+    '[]': '{port}[{k}]',
+    '_': '{port}_{k}'
+}
+
+
+def _field(name):
+    return f'\x00{name}\x00'
+
+
 MONTE_CARLO_SPECTRE = '''\
 mc1 montecarlo variations={variations} savefamilyplots=yes numruns={numruns} {{
     tran1 tran start=0 stop={stop}
@@ -82,7 +133,8 @@ class SpiceTarget(Target):
                  vih_rel=0.6, rz=1e9, conn_order='parse', bus_delim='<>',
                  bus_order='descend', flags=None, ic=None, cap_loads=None,
                  disp_type='on_error', mc_runs=0, mc_variations='all',
-                 vol_rel=0.1, voh_rel=0.9, no_run=False, uic=None):
+                 vol_rel=0.1, voh_rel=0.9, no_run=False, uic=None,
+                 cache_results=False):
         """
         circuit: a magma circuit
 
@@ -150,6 +202,12 @@ class SpiceTarget(Target):
 
         uic: If True, use initial conditions.  If not specified, "uic" is True
              if any initial conditions are specified, and is false otherwise.
+
+        cache_results: If True, parsed simulation results are cached in a
+                       pickle file next to each raw file, and reused as long
+                       as the raw file doesn't change.  This is useful with
+                       no_run=True, when the same results are checked
+                       repeatedly.
         """
         # call the super constructor
         super().__init__(circuit)
@@ -183,6 +241,11 @@ class SpiceTarget(Target):
         self.conn_order = conn_order
         self.bus_delim = bus_delim
         self.bus_order = bus_order
+        self._bus_fmt = BUS_FORMATS.get(bus_delim)
+        self._alpha_ordered_ports = None
+        self._parse_ordered_ports = None
+        self._templates = {}
+        self._bit_port_cache = {}
         self.flags = flags if flags is not None else []
         self.ic = ic if ic is not None else {}
         self.cap_loads = cap_loads if cap_loads is not None else {}
@@ -192,6 +255,7 @@ class SpiceTarget(Target):
         self.vol_rel = vol_rel
         self.voh_rel = voh_rel
         self.no_run = no_run
+        self.cache_results = cache_results
 
         # set default for "uic"
         if uic is None:
@@ -201,14 +265,15 @@ class SpiceTarget(Target):
                 uic = False
         self.uic = uic
 
-        # set list of signals to save
-        self.saves = set()
+        # set list of signals to save.  this is a dictionary used as an
+        # ordered set, so that signals are always probed in the same order
+        self.saves = {}
         for name, port in self.circuit.interface.ports.items():
             if isinstance(port, m.BitsType):
                 for k in range(len(port)):
-                    self.saves.add(self.bit_from_bus(name, k))
+                    self.saves[self.bit_from_bus(name, k)] = None
             else:
-                self.saves.add(f'{name}')
+                self.saves[f'{name}'] = None
 
     def run(self, actions):
         # compile the actions
@@ -218,14 +283,7 @@ class SpiceTarget(Target):
         tb_file = self.write_test_bench(comp)
 
         # generate simulator commands
-        if self.simulator == 'ngspice':
-            cmd, raw_files = self.ngspice_cmds(tb_file)
-        elif self.simulator == 'spectre':
-            cmd, raw_files = self.spectre_cmds(tb_file)
-        elif self.simulator == 'hspice':
-            cmd, raw_files = self.hspice_cmds(tb_file)
-        else:
-            raise NotImplementedError(self.simulator)
+        cmd, raw_files = self.sim_cmds(tb_file)
 
         # run the simulation commands
         if not self.no_run:
@@ -234,23 +292,74 @@ class SpiceTarget(Target):
 
         # process the results
         for raw_file in raw_files:
-            if self.simulator in {'ngspice'}:
-                results = nut_parse(raw_file)
-            elif self.simulator in {'spectre'}:
-                results = psf_parse(raw_file)
-            elif self.simulator in {'hspice'}:
-                results = hspice_parse(raw_file)
-            else:
-                raise NotImplementedError(self.simulator)
+            results = parse_results(self.simulator, raw_file,
+                                    cache=self.cache_results)
+            self.process_results(results=results, comp=comp)
+
+    def run_many(self, actions_list, max_workers=None):
+        """
+        Run several independent tests, given as a list of action lists,
+        with the simulations running in parallel.  Each test is written to
+        its own subdirectory "run_<i>" of the build directory.  Prints,
+        gets, and checks are processed in the same order as actions_list.
+
+        max_workers: maximum number of simulations to run at once.
+                     Defaults to the number of CPUs.
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count()
+
+        # compile each test and write it to its own directory
+        comps = []
+        jobs = []
+        for k, actions in enumerate(actions_list):
+            directory = Path(self.directory) / f'run_{k}'
+            os.makedirs(directory, exist_ok=True)
+            comp = self.compile_actions(actions)
+            tb_file = self.write_test_bench(
+                comp, tb_file=directory / f'{self.circuit.name}_tb.sp')
+            cmd, raw_files = self.sim_cmds(tb_file, directory=directory)
+            comps.append(comp)
+            jobs.append(dict(
+                cmd=cmd,
+                cwd=directory,
+                env=self.sim_env,
+                disp_type=self.disp_type,
+                no_run=self.no_run,
+                cache_results=self.cache_results,
+                simulator=self.simulator,
+                raw_files=raw_files
+            ))
+
+        # run the simulations and parse their results in parallel.  results
+        # are returned in the same order as the jobs.
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            all_results = list(executor.map(_run_sim_job, jobs))
+
+        # process the results
+        for comp, results_list in zip(comps, all_results):
+            for results in results_list:
+                self.process_results(results=results, comp=comp)
+
+    def sim_cmds(self, tb_file, directory=None):
+        if self.simulator == 'ngspice':
+            return self.ngspice_cmds(tb_file, directory=directory)
+        elif self.simulator == 'spectre':
+            return self.spectre_cmds(tb_file, directory=directory)
+        elif self.simulator == 'hspice':
+            return self.hspice_cmds(tb_file, directory=directory)
+        else:
+            raise NotImplementedError(self.simulator)
 
-            # print results
-            self.print_results(results=results, prints=comp.prints)
+    def process_results(self, results, comp):
+        # print results
+        self.print_results(results=results, prints=comp.prints)
 
-            # implement all of the gets
-            self.impl_all_gets(results=results, gets=comp.gets)
+        # implement all of the gets
+        self.impl_all_gets(results=results, gets=comp.gets)
 
-            # check results
-            self.check_results(results=results, checks=comp.checks)
+        # check results
+        self.check_results(results=results, checks=comp.checks)
 
     def expand_bus(self, action):
         # define bit-access function for the action's value
@@ -265,25 +374,48 @@ class SpiceTarget(Target):
                 value = hwtypes.BitVector[len(action.port)](action.value)
                 return value[k]
 
-        # return a list of single-bit pokes
-        retval = []
-
         # for each bit...
         for k in range(len(action.port)):
-            # create a new action corresponding to that single bit
-            # copy is used to preserve any other properties of
-            # the action that are not bit-index specific (e.g.,
-            # "strict" for expect).  Still, it's a bit hacky and
-            # there is likely a better way...
-            bit_action = copy(action)
-            bit_action.port = m.Bit(name=self.bit_from_bus(action.port, k))
-            bit_action.value = get_value_at_bit(k)
-            retval.append(bit_action)
-
-        # return the new list of expanded-out actions
-        return retval
+            # yield a new action corresponding to that single bit,
+            # preserving any other properties of the action that are
+            # not bit-index specific (e.g., "strict" for expect)
+            yield action.clone_with(
+                port=self._bit_port(self.bit_from_bus(action.port, k)),
+                value=get_value_at_bit(k)
+            )
+
+    def expand_buses(self, actions):
+        # yields the actions, with bus pokes and expects expanded out
+        # into single-bit actions
+        for action in actions:
+            if isinstance(action, (Poke, Expect)) \
+               and isinstance(action.port, m.Bits):
+                yield from self.expand_bus(action)
+            else:
+                yield action
+
+    def _bit_port(self, name):
+        # returns a single-bit port with the given name.  ports are reused
+        # across actions since creating them is relatively slow.
+        port = self._bit_port_cache.get(name)
+        if port is None:
+            port = self._bit_port_cache[name] = m.Bit(name=name)
+        return port
 
     def compile_actions(self, actions):
+        # if there is no stimulus or measurement at all, the test is just
+        # a simulation of the given length
+        if all(isinstance(action, (Delay, Eval)) for action in actions):
+            return CompiledSpiceActions(
+                pwls={},
+                checks=[],
+                prints=[],
+                gets=[],
+                stop_time=sum(action.time for action in actions
+                              if isinstance(action, Delay)),
+                saves=self.saves
+            )
+
         # initialize
         t = 0
         pwc_dict = {}
@@ -291,45 +423,57 @@ class SpiceTarget(Target):
         prints = []
         gets = []
 
-        # expand buses as needed
-        _actions = []
-        for action in actions:
-            if isinstance(action, (Poke, Expect)) \
-               and isinstance(action.port, m.Bits):
-                _actions += self.expand_bus(action)
-            else:
-                _actions.append(action)
-        actions = _actions
-
-        # loop over actions handling pokes, expects, and delays
-        for action in actions:
+        # port names are converted to strings, and ports are classified
+        # as digital or analog, once per port, since the same port is
+        # usually referenced by many actions
+        # info is keyed by the id of the port, and a reference to the port
+        # is kept so that the id isn't reused while actions are compiled.
+        port_info = {}
+
+        def get_port_info(port):
+            key = id(port)
+            if key not in port_info:
+                port_info[key] = (f'{port.name}', isinstance(port, m.Bit),
+                                  port)
+            return port_info[key][:2]
+
+        # stimulus value and switch state for digital pokes, indexed by
+        # the logic level being poked
+        d2a = {False: (0, 1), True: (self.vsup, 1)}
+
+        # loop over actions handling pokes, expects, and delays.  buses
+        # are expanded into single-bit actions as they are encountered.
+        for action in self.expand_buses(actions):
             if isinstance(action, Poke):
                 # add port to stimulus dictionary if needed
-                action_port_name = f'{action.port.name}'
+                action_port_name, is_bit = get_port_info(action.port)
+                # the stimulus is stored as parallel lists of times,
+                # values, and switch states
                 if action_port_name not in pwc_dict:
-                    pwc_dict[action_port_name] = ([], [])
+                    pwc_dict[action_port_name] = ([], [], [])
                 # determine the stimulus value, performing a digital
                 # to analog conversion if needed and controlling
                 # the output switch as needed
                 if action.value is fault.HiZ:
-                    stim_v = 0
-                    stim_s = 0
-                elif isinstance(action.port, m.Bit):
-                    stim_v = self.vsup if action.value else 0
-                    stim_s = 1
+                    stim_v, stim_s = 0, 0
+                elif is_bit:
+                    stim_v, stim_s = d2a[bool(action.value)]
                 else:
-                    stim_v = action.value
-                    stim_s = 1
+                    stim_v, stim_s = action.value, 1
                 # add the value to the list of actions
-                pwc_dict[action_port_name][0].append((t, stim_v))
-                pwc_dict[action_port_name][1].append((t, stim_s))
+                pwc_t, pwc_v, pwc_s = pwc_dict[action_port_name]
+                pwc_t.append(t)
+                pwc_v.append(stim_v)
+                pwc_s.append(stim_s)
                 # increment time if desired
                 if action.delay is None:
                     t += self.clock_step_delay * 1e-9
                 else:
                     t += action.delay
             elif isinstance(action, Expect):
-                checks.append((t, action))
+                name, is_bit = get_port_info(action.port)
+                checks.append((t, name.split('.')[-1],
+                               self.make_checker(action, is_bit=is_bit)))
             elif isinstance(action, Print):
                 prints.append((t, action))
             elif isinstance(action, GetValue):
@@ -341,12 +485,16 @@ class SpiceTarget(Target):
             else:
                 raise NotImplementedError(action)
 
-        # refactor stimulus voltages to PWL
+        # refactor stimulus voltages to PWL.  the piecewise-constant
+        # stimulus is converted to arrays once per port so that the
+        # PWL generation itself is vectorized.
         pwls = {}
-        for name, pwc in pwc_dict.items():
+        for name, (pwc_t, pwc_v, pwc_s) in pwc_dict.items():
+            pwc_t = np.array(pwc_t, dtype=float)
             pwls[name] = (
-                pwc_to_pwl(pwc=pwc[0], t_stop=t, t_tr=self.t_tr),
-                pwc_to_pwl(pwc=pwc[1], t_stop=t, t_tr=self.t_tr, init=1)
+                pwc_to_pwl_vec(pwc_t, pwc_v, t_stop=t, t_tr=self.t_tr),
+                pwc_to_pwl_vec(pwc_t, pwc_s, t_stop=t, t_tr=self.t_tr,
+                               init=1)
             )
 
         # return PWL waveforms, checks to be performed, and stop time
@@ -361,7 +509,7 @@ class SpiceTarget(Target):
 
     @staticmethod
     def pwl_str(pwl):
-        return ' '.join(f'{t} {v}' for t, v in pwl)
+        return pwl_str(pwl)
 
     def get_ordered_ports(self):
         if self.conn_order == 'alpha':
@@ -372,16 +520,18 @@ class SpiceTarget(Target):
             raise Exception(f'Unknown conn_order: {self.conn_order}.')
 
     def bit_from_bus(self, port, k):
-        if self.bus_delim == '<>':
-            return f'{port}<{k}>'
-        elif self.bus_delim == '[]':
-            return f'{port}[{k}]'
-        elif self.bus_delim == '_':
-            return f'{port}_{k}'
-        else:
+        if self._bus_fmt is None:
             raise Exception(f'Unknown bus delimeter: {self.bus_delim}')
+        return self._bus_fmt.format(port=port, k=k)
 
     def get_alpha_ordered_ports(self):
+        # the port order only depends on the circuit, so it is
+        # computed once and reused for every testbench
+        if self._alpha_ordered_ports is None:
+            self._alpha_ordered_ports = self._alpha_ordered_ports_uncached()
+        return list(self._alpha_ordered_ports)
+
+    def _alpha_ordered_ports_uncached(self):
         # get ports sorted in alphabetical order
         port_names = self.circuit.interface.ports.keys()
         port_names = sorted(port_names, key=lambda p: f'{p}')
@@ -399,13 +549,20 @@ class SpiceTarget(Target):
                     bit_idx = reversed(range(len(port)))
                 else:
                     raise Exception(f'Unsupported bus order: {self.bus_order}')
-                for k in bit_idx:
-                    retval += [self.bit_from_bus(port, k)]
+                retval += [self.bit_from_bus(port, k) for k in bit_idx]
 
-        # return ordered list of ports
-        return retval
+        # return ordered ports
+        return tuple(retval)
 
     def get_parse_ordered_ports(self):
+        # parsing the model files is slow, so the port order is only
+        # determined once and reused for every testbench
+        if self._parse_ordered_ports is None:
+            self._parse_ordered_ports = tuple(
+                self._parse_ordered_ports_uncached())
+        return list(self._parse_ordered_ports)
+
+    def _parse_ordered_ports_uncached(self):
         for path in self.model_paths:
             parser = SimulatorNetlist(f'{path}')
             search_name = f'{self.circuit.name}'.lower()
@@ -414,7 +571,74 @@ class SpiceTarget(Target):
         else:
             raise Exception(f'Could not find subcircuit {self.circuit.name}.')
 
-    def write_test_bench(self, comp, tb_file=None):
+    def tb_structural_key(self, comp):
+        # Returns a tuple that captures everything about the testbench
+        # except for the numeric stimulus values and simulation times.
+        # Testbenches with the same key share the same template.
+        return (
+            TB_TEMPLATE_VERSION,
+            f'{self.circuit.name}',
+            # resolved, since the template includes the resolved paths
+            tuple(f'{Path(path).resolve()}' for path in self.model_paths),
+            tuple(self.get_ordered_ports()),
+            tuple((f'{port.name}', val)
+                  for port, val in self.cap_loads.items()),
+            tuple(self.get_ic_dict().items()),
+            self.simulator,
+            self.rout,
+            self.rz,
+            self.uic,
+            self.mc_runs,
+            self.mc_variations,
+            tuple(comp.pwls.keys()),
+            tuple(comp.saves)
+        )
+
+    def get_ic_dict(self):
+        ic = {}
+        for key, val in self.ic.items():
+            if isinstance(key, SelectPath):
+                ic[f'X0.{key.spice_path}'] = val
+            else:
+                ic[f'{key}'] = val
+        return ic
+
+    def get_template(self, structural_key):
+        # templates already used by this target are kept in memory, so
+        # that repeated runs only have to fill in the stimulus values
+        if structural_key in self._templates:
+            return self._templates[structural_key]
+
+        # look for a template saved to disk by a previous run, falling
+        # back to building the template from scratch
+        digest = hashlib.sha256(repr(structural_key).encode()).hexdigest()
+        template_file = Path(self.directory) / f'tb_{digest}.sp.tmpl'
+        if template_file.exists():
+            template = template_file.read_text()
+        else:
+            template = self._build_template(structural_key)
+            # the template is written to a temporary file that is then
+            # renamed, so that another process sharing the build directory
+            # never reads a partially written template
+            fd, tmp_file = tempfile.mkstemp(dir=template_file.parent,
+                                            prefix=template_file.name,
+                                            suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(template)
+                os.replace(tmp_file, template_file)
+            except BaseException:
+                os.remove(tmp_file)
+                raise
+        self._templates[structural_key] = template
+        return template
+
+    def _build_template(self, structural_key):
+        # returns the text of the testbench, with {PLACEHOLDER} fields
+        # for the stimulus waveforms and simulation times
+        stim_names = structural_key[-2]
+        saves = structural_key[-1]
+
         # create a new netlist
         netlist = SpiceNetlist()
         netlist.comment('Automatically generated file.')
@@ -443,32 +667,35 @@ class SpiceTarget(Target):
                         pwl=[(0, self.rz), (1, self.rout)])
         netlist.end_subckt()
 
-        # write stimuli lines
-        for name, (pwl_v, pwl_s) in comp.pwls.items():
-            # instantiate switch between voltage source and DUT
+        # write stimuli lines.  these are built up as a list and added
+        # to the netlist all at once, since there may be many of them.
+        inst_count = netlist.inst_count
+        stim_lines = []
+        for k, name in enumerate(stim_names):
             vnet = f'__{name}_v'
             snet = f'__{name}_s'
-            netlist.instantiate('inout_sw_mod', vnet, name, snet, '0')
-
-            # instantiate voltage source connected through switch
-            netlist.voltage(vnet, '0', pwl=pwl_v)
-            netlist.voltage(snet, '0', pwl=pwl_s)
+            stim_lines += [
+                # switch between voltage source and DUT
+                f'X{next(inst_count)} {vnet} {name} {snet} 0 {inout_sw_mod}',
+                # voltage source connected through switch
+                f'V{next(inst_count)} {vnet} 0 DC {_field(f"VDC{k}")} '
+                f'PWL({_field(f"VPWL{k}")})',
+                # voltage source controlling the switch
+                f'V{next(inst_count)} {snet} 0 DC {_field(f"SDC{k}")} '
+                f'PWL({_field(f"SPWL{k}")})'
+            ]
+        netlist.println_lines(stim_lines)
 
         # specify initial conditions if needed
-        ic = {}
-        for key, val in self.ic.items():
-            if isinstance(key, SelectPath):
-                ic[f'X0.{key.spice_path}'] = val
-            else:
-                ic[f'{key}'] = val
+        ic = self.get_ic_dict()
         if ic != {}:
             netlist.ic(ic)
 
         # specify the transient analysis
-        t_step = (self.t_step if self.t_step is not None
-                  else comp.stop_time / 1000)
+        t_step = _field('T_STEP')
+        t_stop = _field('T_STOP')
         if self.simulator in {'hspice', 'ngspice'}:
-            netlist.tran(t_step=t_step, t_stop=comp.stop_time, uic=self.uic)
+            netlist.tran(t_step=t_step, t_stop=t_stop, uic=self.uic)
 
         # generate control statement
         if self.simulator == 'ngspice':
@@ -483,119 +710,203 @@ class SpiceTarget(Target):
 
         # write end of file
         if self.simulator == 'spectre':
-            netlist.probe(*comp.saves, wrap=True)
+            netlist.probe(*saves, wrap=True)
             if self.mc_runs == 0:
-                netlist.tran(t_step=t_step, t_stop=comp.stop_time, uic=self.uic)
+                netlist.tran(t_step=t_step, t_stop=t_stop, uic=self.uic)
             else:
                 netlist.println('simulator lang=spectre')
                 netlist.print(MONTE_CARLO_SPECTRE.format(
                     variations=self.mc_variations,
                     numruns=self.mc_runs,
-                    stop=comp.stop_time
+                    stop=t_stop
                 ))
         elif self.simulator == 'hspice':
-            netlist.probe(*comp.saves, wrap=True, antype='TRAN')
+            netlist.probe(*saves, wrap=True, antype='TRAN')
             netlist.end_file()
         elif self.simulator == 'ngspice':
-            netlist.probe(*comp.saves, wrap=True)
+            netlist.probe(*saves, wrap=True)
             netlist.end_file()
 
+        # escape any literal braces, then turn the field markers
+        # into format placeholders
+        template = netlist.text.replace('{', '{{').replace('}', '}}')
+        return FIELD_RE.sub(r'{\1}', template)
+
+    @staticmethod
+    def _fill_template(template, comp, t_step):
+        values = {'T_STEP': t_step, 'T_STOP': comp.stop_time}
+        for k, (pwl_v, pwl_s) in enumerate(comp.pwls.values()):
+            values[f'VDC{k}'] = pwl_v[0][1]
+            values[f'VPWL{k}'] = pwl_str(pwl_v)
+            values[f'SDC{k}'] = pwl_s[0][1]
+            values[f'SPWL{k}'] = pwl_str(pwl_s)
+        return template.format_map(values)
+
+    def write_test_bench(self, comp, tb_file=None):
+        # get the testbench template, which only depends on the
+        # structure of the test, then fill in the stimulus values
+        template = self.get_template(self.tb_structural_key(comp))
+        t_step = (self.t_step if self.t_step is not None
+                  else comp.stop_time / 1000)
+        text = self._fill_template(template, comp, t_step)
+
         # write spice file
         tb_file = (tb_file if tb_file is not None
                    else Path(self.directory) / f'{self.circuit.name}_tb.sp')
         tb_file = tb_file.absolute()
-        netlist.write_to_file(tb_file)
+        # the testbench is encoded in one step and written as bytes,
+        # rather than going through the text layer
+        with open(tb_file, 'wb') as f:
+            f.write(text.encode())
 
         # return name of the file written
         return tb_file
 
-    def impl_expect(self, results, time, action):
-        # get value
-        name = f'{action.port.name}'.split('.')[-1]
-
-        # get value, performing analog to digital conversion
-        # if necessary
-        value = results[name](time)
-        if isinstance(action.port, m.Bit):
-            if value <= self.vil_rel * self.vsup:
-                value = 0
-            elif value >= self.vih_rel * self.vsup:
-                value = 1
-            else:
-                raise A2DError(f'Invalid logic level: {value}.')
+    def make_checker(self, action, is_bit=None):
+        # returns a function checker(time, value, level) that implements
+        # the expect "action", given the measured value of the port and
+        # its logic level (0, 1, or -1 if invalid).  the kind of check
+        # is determined once here, rather than every time it is run.
+        # "is_bit" indicates whether the port is digital, and is
+        # determined from the port if not provided.
+        if is_bit is None:
+            is_bit = isinstance(action.port, m.Bit)
+        above, below, expected = action.above, action.below, action.value
+        if above is not None and below is not None:
+            def failed(value):
+                return not (above <= value <= below)
+
+            def err_msg(value):
+                return f'Expected {above} to {below}, got {value}'
+        elif above is not None:
+            def failed(value):
+                return not (above <= value)
+
+            def err_msg(value):
+                return f'Expected above {above}, got {value}.'
+        elif below is not None:
+            def failed(value):
+                return not (value <= below)
+
+            def err_msg(value):
+                return f'Expected below {below}, got {value}.'
+        else:
+            def failed(value):
+                return not (value == expected)
+
+            def err_msg(value):
+                return f'Expected {expected}, got {value}.'
+
+        # digital ports are checked using their logic level
+        if is_bit:
+            def checker(time, value, level):
+                if level == -1:
+                    raise A2DError(f'Invalid logic level: {value}.')
+                level = int(level)
+                if failed(level):
+                    self.expect_error(time, action, err_msg(level))
+        else:
+            def checker(time, value, level):
+                if failed(value):
+                    self.expect_error(time, action, err_msg(value))
+
+        return checker
 
-        # determine the condition and error body
+    def expect_error(self, time, action, err_msg):
+        # determine the error header
         err_hdr = ''
         err_hdr += f'Failed checking port {action.port.name}'
         err_hdr += f' at time {time:0.3e}'
         if action.traceback is not None:
             err_hdr += f' with traceback {action.traceback}'
 
-        # implement the requested check
-        err_msg = None
-        if action.above is not None:
-            if action.below is not None:
-                if not (action.above <= value <= action.below):
-                    err_msg = f'Expected {action.above} to {action.below}, got {value}'  # noqa
-            else:
-                if not (action.above <= value):
-                    err_msg = f'Expected above {action.above}, got {value}.'
-        else:
-            if action.below is not None:
-                if not (value <= action.below):
-                    err_msg = f'Expected below {action.below}, got {value}.'
-            else:
-                if not (value == action.value):
-                    err_msg = f'Expected {action.value}, got {value}.'
-
-        # raise exception if there was an error
-        if err_msg is not None:
-            raise ExpectError(f'{err_hdr}.  {err_msg}.')
+        # raise the exception
+        raise ExpectError(f'{err_hdr}.  {err_msg}.')
 
     def check_results(self, results, checks):
-        for check in checks:
-            self.impl_expect(results=results, time=check[0], action=check[1])
+        if len(checks) == 0:
+            return
+
+        # look up the values for all checks at once
+        values = eval_results(results=results,
+                              names=[name for _, name, _ in checks],
+                              times=[time for time, _, _ in checks])
+
+        # analog to digital conversion for all values at once.  invalid
+        # logic levels are marked with -1.
+        levels = np.where(values <= self.vil_rel * self.vsup, 0,
+                          np.where(values >= self.vih_rel * self.vsup, 1, -1))
+
+        # implement the checks in order
+        for (time, _, checker), value, level in zip(checks, values, levels):
+            checker(time, value, level)
 
-    def impl_print(self, results, time, action):
-        # get port values
-        port_values = [results[f'{port.name}'](time) for port in action.ports]
+    def impl_print(self, action, port_values):
         # print formatted output
         print(action.format_str.format(*port_values))
 
     def print_results(self, results, prints):
-        for print_ in prints:
-            self.impl_print(results=results, time=print_[0], action=print_[1])
+        if len(prints) == 0:
+            return
+
+        # look up the values for all ports of all prints at once
+        names = []
+        times = []
+        for time, action in prints:
+            names += [f'{port.name}' for port in action.ports]
+            times += [time] * len(action.ports)
+        values = eval_results(results=results, names=names, times=times)
+
+        # print the values in order
+        k = 0
+        for _, action in prints:
+            n = len(action.ports)
+            self.impl_print(action=action, port_values=values[k:k + n])
+            k += n
 
     def impl_all_gets(self, results, gets):
-        for get in gets:
-            self.impl_get(results=results, time=get[0], action=get[1])
+        if len(gets) == 0:
+            return
+
+        # look up the values for all gets at once
+        values = eval_results(
+            results=results,
+            names=[f'{action.port.name}' for _, action in gets],
+            times=[time for time, _ in gets]
+        )
+
+        # write values back to actions
+        for (_, action), value in zip(gets, values):
+            self.impl_get(action=action, value=value)
 
-    def impl_get(self, results, time, action):
-        # get port values
-        port_value = results[f'{action.port.name}'](time)
+    def impl_get(self, action, value):
         # write value back to action
-        action.value = port_value
+        action.value = value
+
+    def ngspice_cmds(self, tb_file, directory=None):
+        directory = directory if directory is not None else self.directory
 
-    def ngspice_cmds(self, tb_file):
         # build up the command
         cmd = []
         cmd += ['ngspice']
         cmd += ['-b']
         cmd += [f'{tb_file}']
-        raw_file = (Path(self.directory) / 'out.raw').absolute()
+        raw_file = (Path(directory) / 'out.raw').absolute()
         cmd += ['-r', f'{raw_file}']
         cmd += self.flags
 
         # return command and corresponding raw file
         return cmd, [raw_file]
 
-    def spectre_cmds(self, tb_file):
+    def spectre_cmds(self, tb_file, directory=None):
+        directory = directory if directory is not None else self.directory
+
         # build up the command
         cmd = []
         cmd += ['spectre']
         cmd += [f'{tb_file}']
         cmd += ['-format', 'psfascii']
-        raw_dir = (Path(self.directory) / 'psf').resolve()
+        raw_dir = (Path(directory) / 'psf').resolve()
         cmd += ['-raw', f'{raw_dir}']
         cmd += self.flags
 
@@ -611,12 +922,14 @@ class SpiceTarget(Target):
         # return command and corresponding raw file
         return cmd, raw_files
 
-    def hspice_cmds(self, tb_file):
+    def hspice_cmds(self, tb_file, directory=None):
+        directory = directory if directory is not None else self.directory
+
         # build up the simulation command
         cmd = []
         cmd += ['hspice']
         cmd += ['-i', f'{tb_file}']
-        out_file = (Path(self.directory) / 'out.raw').absolute()
+        out_file = (Path(directory) / 'out.raw').absolute()
         cmd += ['-o', f'{out_file}']
         cmd += self.flags
 
@@ -10,6 +10,15 @@ import inspect
 from hwtypes import BitVector
 
 
+def _to_list(value):
+    # numpy arrays are converted to (nested) lists of ints in a single step,
+    # so that bulk pokes and expects of array ports can be given as numpy
+    # arrays and the elements are not numpy scalars
+    if hasattr(value, "tolist") and hasattr(value, "ndim"):
+        return value.tolist()
+    return value
+
+
 class TesterBase:
     def __init__(self, circuit: m.Circuit, clock: m.Clock = None,
                  reset: m.Reset = None, poke_delay_default=None,
@@ -28,6 +37,10 @@ class TesterBase:
         self._circuit = circuit
         self.poke_delay_default = poke_delay_default
         self.expect_strict_default = expect_strict_default
+        # actions are kept as a plain list of objects rather than a packed
+        # buffer, since their values may be BitVectors, expressions, loop
+        # indices, etc. and targets and control structures index and extend
+        # the list directly
         self.actions = []
         if clock is not None:
             if not isinstance(clock, m.Clock):
@@ -84,6 +97,8 @@ class TesterBase:
         if port is self.clock:
             self.clock_initialized = True
 
+        value = _to_list(value)
+
         def recurse(port):
             if isinstance(value, dict):
                 for k, v in value.items():
@@ -158,6 +173,7 @@ class TesterBase:
                 caller = inspect.getframeinfo(previous_frame)
             except IndexError:
                 pass
+        value = _to_list(value)
 
         def recurse(port):
             if isinstance(value, dict):
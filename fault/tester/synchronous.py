@@ -41,6 +41,17 @@ class SynchronousTester(StagedTester):
         self._call_monitors()
         self.step(1)
 
+    def advance_cycles(self, n):
+        """
+        Advance `n` clock cycles.  Without monitors this emits a single
+        step action rather than two per cycle.
+        """
+        if self.monitors:
+            for _ in range(n):
+                self.advance_cycle()
+        elif n > 0:
+            self.step(2 * n)
+
     def make_target(self, target, **kwargs):
         if target == "system-verilog":
             return SynchronousSystemVerilogTarget(self._circuit,
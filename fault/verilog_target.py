@@ -334,10 +334,11 @@ class VerilogTarget(Target):
         get_value_actions = [action for action in all_actions
                              if isinstance(action, actions.GetValue)]
         if len(get_value_actions) > 0:
+            # the file is read line by line rather than all at once, and
+            # reading stops once every action has a value
             with open(self.value_file.name, 'r') as f:
-                lines = f.readlines()
-            for line, action in zip(lines, get_value_actions):
-                action.update_from_line(line)
+                for line, action in zip(f, get_value_actions):
+                    action.update_from_line(line)
 
     @staticmethod
     def in_var(file):
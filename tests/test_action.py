@@ -1,6 +1,6 @@
 from fault import Tester
 from fault.actions import Poke, Expect, Eval, Step, Print, Peek, FileOpen, \
-    FileRead, FileWrite, FileClose, Loop
+    FileRead, FileWrite, FileClose, Loop, Assume
 from fault.file import File
 from .common import TestBasicClkCircuit
 
@@ -23,3 +23,29 @@ def test_action_strs():
     assert str(FileRead(file)) == 'FileRead(File<"my_file">)'
     assert str(FileWrite(file, 3)) == 'FileWrite(File<"my_file">, 3)'
     assert str(FileClose(file)) == 'FileClose(File<"my_file">)'
+
+
+def test_action_clone_with():
+    circ = TestBasicClkCircuit
+    expect = Expect(circ.O, 1, strict=True, above=0, below=2)
+    clone = expect.clone_with(port=circ.I, value=0)
+    assert str(clone) == 'Expect(BasicClkCircuit.I, 0)'
+    assert (clone.strict, clone.above, clone.below) == (True, 0, 2)
+    # the original action is unchanged
+    assert str(expect) == 'Expect(BasicClkCircuit.O, 1)'
+    poke = Poke(circ.I, 1, delay=3)
+    clone = poke.clone_with(port=circ.O, value=0)
+    assert (clone.port, clone.value, clone.delay) == (circ.O, 0, 3)
+    # attributes outside of __slots__ are copied too
+    assume = Assume(circ.I, lambda x: x)
+    assume.has_randvals = True
+    clone = assume.clone_with(port=circ.O, value=None)
+    assert clone.has_randvals
+    assert "port" not in clone.__dict__
+
+
+def test_action_slots():
+    circ = TestBasicClkCircuit
+    for action in [Poke(circ.I, 1), Expect(circ.O, 1), Eval(),
+                   Step(circ.CLK, 1), Print("%08x", circ.O), Peek(circ.O)]:
+        assert not hasattr(action, "__dict__")
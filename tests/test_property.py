@@ -1,22 +1,73 @@
 import shutil
-import random
+from functools import lru_cache, wraps
 
 import pytest
-import decorator
 import fault as f
 import magma as m
 
 
+@lru_cache(maxsize=1)
+def _have_ncsim():
+    return shutil.which("ncsim") is not None
+
+
+# These tests are run with ncsim rather than Verilator because they use SVA
+# constructs that Verilator does not support (e.g. s_eventually, until, goto
+# repetition, cover) and match ncsim's assertion failure and coverage output.
 def requires_ncsim(test_fn):
-    def wrapper(test_fn, *args, **kwargs):
-        if not shutil.which("ncsim"):
+    @wraps(test_fn)
+    def wrapper(*args, **kwargs):
+        if not _have_ncsim():
             return pytest.skip("need ncsim for SVA test")
         return test_fn(*args, **kwargs)
-    return decorator.decorator(wrapper, test_fn)
+    return wrapper
+
+
+_FLAGS = ["-sv"]
+_MAGMA_OPTS = {"sv": True}
+
+# (build directory, circuit) pairs that have already been compiled by magma
+_COMPILED = set()
+
+
+def _run(tester, build_dir, **kwargs):
+    # compile and run a test with ncsim, using the options shared by most of
+    # the tests in this file unless they are overridden.  the defaults are
+    # copied since the target may modify them.
+    #
+    # with the default disp_type ("on_error"), ncsim's output is only printed
+    # when the run fails, in which case an AssertionError is raised, so tests
+    # check failure messages with capsys.  the cover tests pass
+    # disp_type="realtime" so that passing runs print their coverage report,
+    # which they also read with capsys.
+    kwargs.setdefault("flags", list(_FLAGS))
+    kwargs.setdefault("magma_opts", dict(_MAGMA_OPTS))
+    kwargs.setdefault("magma_output", "mlir-verilog")
+
+    # each test passes its own tmp_path as `build_dir`, so tests can run in
+    # parallel, while runs within a test share ncsim's incremental compile
+    # (INCA_libs).
+    #
+    # many tests run several testers on the same circuit, in which case the
+    # circuit only needs to be compiled by magma the first time.  ncsim still
+    # elaborates every run, since its snapshot includes the testbench, which
+    # is different for each tester.
+    key = (build_dir, tester._circuit)
+    if key in _COMPILED:
+        kwargs.setdefault("skip_compile", True)
+    try:
+        tester.compile_and_run("system-verilog", simulator="ncsim",
+                               directory=build_dir, **kwargs)
+    except AssertionError:
+        # the simulation failed (as some tests expect), so magma's output is
+        # still usable
+        _COMPILED.add(key)
+        raise
+    _COMPILED.add(key)
 
 
 @requires_ncsim
-def test_basic_assert():
+def test_basic_assert(tmp_path):
     class Main(m.Circuit):
         io = m.IO(I=m.In(m.Bits[8]), O=m.Out(m.Bits[8])) + m.ClockIO()
         io.O @= m.Register(T=m.Bits[8])()(io.I)
@@ -37,25 +88,27 @@ def test_basic_assert():
     tester.circuit.O.expect(1)
     tester.advance_cycle()
     tester.circuit.O.expect(0)
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True,
-                                       "disable_initial_blocks": True},
-                           flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path,
+         magma_opts={"sv": True, "disable_initial_blocks": True})
+
+
+# Tests of the property DSL put the raw SVA version of each property and the
+# equivalent DSL version in the same circuit, naming them "sva" and "dsl", so
+# that both are checked by the same simulator runs.
+def _assert_failed(out, *names):
+    for name in names:
+        assert f"Assertion Main_tb.dut.{name} has failed" in out, out
 
 
 @requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
-def test_basic_assert_fail(sva, capsys):
+def test_basic_assert_fail(capsys, tmp_path):
     class Main(m.Circuit):
         io = m.IO(I=m.In(m.Bits[8]), O=m.Out(m.Bits[8])) + m.ClockIO()
         io.O @= m.Register(T=m.Bits[8])()(io.I)
-        if sva:
-            f.assert_(f.sva(io.I, "|-> ##1", io.O.value() == 0),
-                      on=f.posedge(io.CLK))
-        else:
-            f.assert_(io.I | f.implies | f.delay[1] | (io.O.value() == 0),
-                      on=f.posedge(io.CLK))
+        f.assert_(f.sva(io.I, "|-> ##1", io.O.value() == 0),
+                  on=f.posedge(io.CLK), name="sva")
+        f.assert_(io.I | f.implies | f.delay[1] | (io.O.value() == 0),
+                  on=f.posedge(io.CLK), name="dsl")
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.I = 1
@@ -67,34 +120,28 @@ def test_basic_assert_fail(sva, capsys):
     tester.advance_cycle()
     tester.advance_cycle()
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True,
-                                           "disable_initial_blocks": True},
-                               flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path,
+             magma_opts={"sv": True, "disable_initial_blocks": True})
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+    _assert_failed(out, "sva", "dsl")
 
 
 @requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
-def test_variable_delay(sva, capsys):
+def test_variable_delay(capsys, tmp_path):
     class Main(m.Circuit):
         io = m.IO(write=m.In(m.Bit), read=m.In(m.Bit)) + m.ClockIO()
-        if sva:
-            f.assert_(f.sva(io.write, "|-> ##[1:2]", io.read),
-                      on=f.posedge(io.CLK))
-            f.assert_(f.sva(io.write, "|-> ##[*]", io.read),
-                      on=f.posedge(io.CLK))
-            f.assert_(f.sva(io.write, "|-> ##[+]", io.read),
-                      on=f.posedge(io.CLK))
-        else:
-            f.assert_(io.write | f.implies | f.delay[1:2] | io.read,
-                      on=f.posedge(io.CLK))
-            f.assert_(io.write | f.implies | f.delay[0:] | io.read,
-                      on=f.posedge(io.CLK))
-            f.assert_(io.write | f.implies | f.delay[1:] | io.read,
-                      on=f.posedge(io.CLK))
+        f.assert_(f.sva(io.write, "|-> ##[1:2]", io.read),
+                  on=f.posedge(io.CLK), name="sva")
+        f.assert_(f.sva(io.write, "|-> ##[*]", io.read),
+                  on=f.posedge(io.CLK), name="sva_star")
+        f.assert_(f.sva(io.write, "|-> ##[+]", io.read),
+                  on=f.posedge(io.CLK), name="sva_plus")
+        f.assert_(io.write | f.implies | f.delay[1:2] | io.read,
+                  on=f.posedge(io.CLK), name="dsl")
+        f.assert_(io.write | f.implies | f.delay[0:] | io.read,
+                  on=f.posedge(io.CLK), name="dsl_star")
+        f.assert_(io.write | f.implies | f.delay[1:] | io.read,
+                  on=f.posedge(io.CLK), name="dsl_plus")
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.write = 1
@@ -109,9 +156,7 @@ def test_variable_delay(sva, capsys):
     tester.advance_cycle()
     tester.circuit.read = 1
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.write = 1
@@ -120,11 +165,9 @@ def test_variable_delay(sva, capsys):
     tester.advance_cycle()
     tester.advance_cycle()
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+    _assert_failed(out, "sva", "dsl")
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.write = 1
@@ -135,29 +178,26 @@ def test_variable_delay(sva, capsys):
     tester.advance_cycle()
     tester.advance_cycle()
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+    _assert_failed(out, "sva", "dsl")
 
 
 @requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
-def test_repetition(sva, capsys):
+def test_repetition(capsys, tmp_path):
     class Main(m.Circuit):
         io = m.IO(write=m.In(m.Bit), read=m.In(m.Bit)) + m.ClockIO()
         N = 2
-        if sva:
-            seq0 = f.sequence(f.sva(~io.read, "##1", io.write))
-            seq1 = f.sequence(f.sva(io.read, "##1", io.write))
-            f.assert_(f.sva(~io.read & ~io.write, "[*2] |->", seq0,
-                            f"[*{N}] ##1", seq1), on=f.posedge(io.CLK))
-        else:
-            seq0 = f.sequence(~io.read | f.delay[1] | io.write)
-            seq1 = f.sequence(io.read | f.delay[1] | io.write)
-            f.assert_(~io.read & ~io.write | f.repeat[2] | f.implies | seq0 |
-                      f.repeat[N] | f.delay[1] | seq1, on=f.posedge(io.CLK))
+        seq0 = f.sequence(f.sva(~io.read, "##1", io.write))
+        seq1 = f.sequence(f.sva(io.read, "##1", io.write))
+        f.assert_(f.sva(~io.read & ~io.write, "[*2] |->", seq0,
+                        f"[*{N}] ##1", seq1), on=f.posedge(io.CLK),
+                  name="sva")
+        seq0 = f.sequence(~io.read | f.delay[1] | io.write)
+        seq1 = f.sequence(io.read | f.delay[1] | io.write)
+        f.assert_(~io.read & ~io.write | f.repeat[2] | f.implies | seq0 |
+                  f.repeat[N] | f.delay[1] | seq1, on=f.posedge(io.CLK),
+                  name="dsl")
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.write = 0
@@ -171,11 +211,9 @@ def test_repetition(sva, capsys):
         tester.advance_cycle()
     # Should fail if we don't see seq2
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out, out
+    _assert_failed(out, "sva", "dsl")
     tester.circuit.write = 0
     tester.circuit.read = 1
     tester.advance_cycle()
@@ -183,30 +221,25 @@ def test_repetition(sva, capsys):
     tester.circuit.read = 0
     tester.advance_cycle()
     tester.circuit.write = 0
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
 
 
 @requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
 @pytest.mark.parametrize("zero_or_one", [0, 1])
-def test_repetition_or_more(sva, zero_or_one, capsys):
+def test_repetition_or_more(zero_or_one, capsys, tmp_path):
     # TODO: Parens/precedence with nested sequences (could wrap in seq object?)
     class Main(m.Circuit):
         io = m.IO(write=m.In(m.Bit), read=m.In(m.Bit)) + m.ClockIO()
-        if sva:
-            seq0 = f.sva(~io.read, "##1", io.write)
-            seq1 = f.sva(io.read, "##1", io.write)
-            symb = "*" if zero_or_one == 0 else "+"
-            f.assert_(f.sva(seq0, "|-> ##1", io.read, f"[{symb}] ##1", seq1),
-                      on=f.posedge(io.CLK))
-        else:
-            seq0 = ~io.read | f.delay[1] | io.write
-            seq1 = io.read | f.delay[1] | io.write
-            f.assert_(seq0 | f.implies | f.delay[1] | io.read |
-                      f.repeat[zero_or_one:] | f.delay[1] | seq1,
-                      on=f.posedge(io.CLK))
+        seq0 = f.sva(~io.read, "##1", io.write)
+        seq1 = f.sva(io.read, "##1", io.write)
+        symb = "*" if zero_or_one == 0 else "+"
+        f.assert_(f.sva(seq0, "|-> ##1", io.read, f"[{symb}] ##1", seq1),
+                  on=f.posedge(io.CLK), name="sva")
+        seq0 = ~io.read | f.delay[1] | io.write
+        seq1 = io.read | f.delay[1] | io.write
+        f.assert_(seq0 | f.implies | f.delay[1] | io.read |
+                  f.repeat[zero_or_one:] | f.delay[1] | seq1,
+                  on=f.posedge(io.CLK), name="dsl")
 
     for i in range(0, 3):
         tester = f.SynchronousTester(Main, Main.CLK)
@@ -217,11 +250,9 @@ def test_repetition_or_more(sva, zero_or_one, capsys):
         tester.advance_cycle()
         # Should fail if we don't see seq2
         with pytest.raises(AssertionError):
-            tester.compile_and_run("system-verilog", simulator="ncsim",
-                                   magma_opts={"sv": True}, flags=["-sv"],
-                                   magma_output="mlir-verilog")
+            _run(tester, tmp_path)
         out, _ = capsys.readouterr()
-        assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+        _assert_failed(out, "sva", "dsl")
         # do repeated sequence i times
         for _ in range(i):
             tester.circuit.write = 0
@@ -238,39 +269,32 @@ def test_repetition_or_more(sva, zero_or_one, capsys):
         if i == 0 and zero_or_one == 1:
             # Should fail on first try (0 times)
             with pytest.raises(AssertionError):
-                tester.compile_and_run("system-verilog", simulator="ncsim",
-                                       magma_opts={"sv": True}, flags=["-sv"],
-                                       magma_output="mlir-verilog")
+                _run(tester, tmp_path)
         else:
-            tester.compile_and_run("system-verilog", simulator="ncsim",
-                                   magma_opts={"sv": True}, flags=["-sv"],
-                                   magma_output="mlir-verilog")
+            _run(tester, tmp_path)
 
 
 @requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
-@pytest.mark.parametrize("num_reps", [3, slice(3, 5)])
-def test_goto_repetition(sva, num_reps, capsys):
+# "n" is the number of cycles write is held high, which must be within the
+# range of repetitions given by "num_reps"
+@pytest.mark.parametrize("num_reps, n", [(3, 3), (slice(3, 5), 3),
+                                         (slice(3, 5), 5)],
+                         ids=["3-3", "3:5-3", "3:5-5"])
+def test_goto_repetition(num_reps, n, capsys, tmp_path):
     class Main(m.Circuit):
         io = m.IO(write=m.In(m.Bit), read=m.In(m.Bit)) + m.ClockIO()
-        if sva:
-            symb = num_reps
-            if isinstance(symb, slice):
-                symb = f"{symb.start}:{symb.stop}"
-            f.assert_(f.sva(io.write == 1, f"[-> {symb}]", '##1', io.read,
-                            '##1', io.write), on=f.posedge(io.CLK))
-        else:
-            f.assert_((io.write == 1) | f.goto[num_reps] | f.delay[1] | io.read
-                      | f.delay[1] | io.write, on=f.posedge(io.CLK))
+        symb = num_reps
+        if isinstance(symb, slice):
+            symb = f"{symb.start}:{symb.stop}"
+        f.assert_(f.sva(io.write == 1, f"[-> {symb}]", '##1', io.read,
+                        '##1', io.write), on=f.posedge(io.CLK), name="sva")
+        f.assert_((io.write == 1) | f.goto[num_reps] | f.delay[1] | io.read
+                  | f.delay[1] | io.write, on=f.posedge(io.CLK), name="dsl")
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.write = 1
     tester.circuit.read = 0
-    n = num_reps
-    if isinstance(n, slice):
-        n = random.randint(n.start, n.stop)
-    for i in range(n):
-        tester.advance_cycle()
+    tester.advance_cycles(n)
     tester.circuit.read = 1
     tester.circuit.write = 0
     tester.advance_cycle()
@@ -278,69 +302,66 @@ def test_goto_repetition(sva, num_reps, capsys):
     tester.circuit.write = 1
     tester.advance_cycle()
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
     tester.circuit.read = 0
     tester.advance_cycle()
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+    _assert_failed(out, "sva", "dsl")
 
 
-@requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
-def test_eventually(sva, capsys):
+@lru_cache(maxsize=None)
+def _make_eventually_main():
     class Main(m.Circuit):
         io = m.IO(write=m.In(m.Bit), read=m.In(m.Bit)) + m.ClockIO()
-        if sva:
-            f.assert_(
-                f.sva(io.write == 1, "|-> s_eventually", io.read == 1),
-                on=f.posedge(io.CLK)
-            )
-        else:
-            f.assert_((io.write == 1) | f.implies | f.eventually |
-                      (io.read == 1), on=f.posedge(io.CLK))
+        f.assert_(
+            f.sva(io.write == 1, "|-> s_eventually", io.read == 1),
+            on=f.posedge(io.CLK), name="sva"
+        )
+        f.assert_((io.write == 1) | f.implies | f.eventually |
+                  (io.read == 1), on=f.posedge(io.CLK), name="dsl")
+    return Main
 
+
+@requires_ncsim
+@pytest.mark.parametrize("n", [3, 5, 7])
+def test_eventually(n, capsys, tmp_path):
+    Main = _make_eventually_main()
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.write = 1
     tester.circuit.read = 0
     tester.advance_cycle()
     tester.circuit.write = 0
-    for i in range(random.randint(3, 7)):
-        tester.advance_cycle()
+    tester.advance_cycles(n)
     # Read does not eventually go high
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+    _assert_failed(out, "sva", "dsl")
 
     tester.circuit.read = 1
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
 
 
-@requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
-def test_throughout(sva, capsys):
+@lru_cache(maxsize=None)
+def _make_throughout_main():
     class Main(m.Circuit):
         io = m.IO(a=m.In(m.Bit), b=m.In(m.Bit), c=m.In(m.Bit)) + m.ClockIO()
-        if sva:
-            seq = f.sva(io.b, "throughout", "!", io.c, "[-> 1]")
-            f.assert_(f.sva(f.rose(io.a), "|->", seq),
-                      on=f.posedge(io.CLK))
-        else:
-            seq = io.b | f.throughout | (f.not_(io.c) | f.goto[1])
-            f.assert_(f.rose(io.a) | f.implies | seq,
-                      on=f.posedge(io.CLK))
+        seq = f.sva(io.b, "throughout", "!", io.c, "[-> 1]")
+        f.assert_(f.sva(f.rose(io.a), "|->", seq),
+                  on=f.posedge(io.CLK), name="sva")
+        seq = io.b | f.throughout | (f.not_(io.c) | f.goto[1])
+        f.assert_(f.rose(io.a) | f.implies | seq,
+                  on=f.posedge(io.CLK), name="dsl")
+    return Main
+
 
+@requires_ncsim
+@pytest.mark.parametrize("n", [3, 5, 7])
+def test_throughout(n, capsys, tmp_path):
+    Main = _make_throughout_main()
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.a = 0
     tester.circuit.c = 1
@@ -349,15 +370,12 @@ def test_throughout(sva, capsys):
     tester.circuit.a = 1
     tester.circuit.b = 1
     tester.advance_cycle()
-    for i in range(random.randint(3, 7)):
-        tester.advance_cycle()
+    tester.advance_cycles(n)
     tester.circuit.c = 0
     tester.advance_cycle()
     tester.circuit.b = 0
 
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.a = 0
@@ -371,25 +389,28 @@ def test_throughout(sva, capsys):
     tester.advance_cycle()
 
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+    _assert_failed(out, "sva", "dsl")
 
 
-@requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
-def test_until(sva, capsys):
+@lru_cache(maxsize=None)
+def _make_until_main():
     class Main(m.Circuit):
         io = m.IO(a=m.In(m.Bit), b=m.In(m.Bit), c=m.In(m.Bit)) + m.ClockIO()
-        if sva:
-            seq = f.sequence(f.sva(io.b, "until !", io.c))
-            f.assert_(f.sva(f.rose(io.a), "|->", seq), on=f.posedge(io.CLK))
-        else:
-            seq = f.sequence(io.b | f.until | f.not_(io.c))
-            f.assert_(f.rose(io.a) | f.implies | seq, on=f.posedge(io.CLK))
+        seq = f.sequence(f.sva(io.b, "until !", io.c))
+        f.assert_(f.sva(f.rose(io.a), "|->", seq), on=f.posedge(io.CLK),
+                  name="sva")
+        seq = f.sequence(io.b | f.until | f.not_(io.c))
+        f.assert_(f.rose(io.a) | f.implies | seq, on=f.posedge(io.CLK),
+                  name="dsl")
+    return Main
+
 
+@requires_ncsim
+@pytest.mark.parametrize("n", [3, 5, 7])
+def test_until(n, capsys, tmp_path):
+    Main = _make_until_main()
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.a = 0
     tester.circuit.c = 1
@@ -398,15 +419,12 @@ def test_until(sva, capsys):
     tester.circuit.a = 1
     tester.circuit.b = 1
     tester.advance_cycle()
-    for i in range(random.randint(3, 7)):
-        tester.advance_cycle()
+    tester.advance_cycles(n)
     tester.circuit.b = 0
     tester.circuit.c = 0
     tester.advance_cycle()
 
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.a = 0
@@ -423,25 +441,28 @@ def test_until(sva, capsys):
     tester.circuit.c = 0
 
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+    _assert_failed(out, "sva", "dsl")
 
 
-@requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
-def test_until_with(sva, capsys):
+@lru_cache(maxsize=None)
+def _make_until_with_main():
     class Main(m.Circuit):
         io = m.IO(a=m.In(m.Bit), b=m.In(m.Bit), c=m.In(m.Bit)) + m.ClockIO()
-        if sva:
-            seq = f.sequence(f.sva(io.b, "until_with !", io.c))
-            f.assert_(f.sva(f.rose(io.a), "|->", seq), on=f.posedge(io.CLK))
-        else:
-            seq = f.sequence(io.b | f.until_with | f.not_(io.c))
-            f.assert_(f.rose(io.a) | f.implies | seq, on=f.posedge(io.CLK))
+        seq = f.sequence(f.sva(io.b, "until_with !", io.c))
+        f.assert_(f.sva(f.rose(io.a), "|->", seq), on=f.posedge(io.CLK),
+                  name="sva")
+        seq = f.sequence(io.b | f.until_with | f.not_(io.c))
+        f.assert_(f.rose(io.a) | f.implies | seq, on=f.posedge(io.CLK),
+                  name="dsl")
+    return Main
 
+
+@requires_ncsim
+@pytest.mark.parametrize("n", [3, 5, 7])
+def test_until_with(n, capsys, tmp_path):
+    Main = _make_until_with_main()
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.a = 0
     tester.circuit.c = 1
@@ -450,16 +471,13 @@ def test_until_with(sva, capsys):
     tester.circuit.a = 1
     tester.circuit.b = 1
     tester.advance_cycle()
-    for i in range(random.randint(3, 7)):
-        tester.advance_cycle()
+    tester.advance_cycles(n)
     tester.circuit.c = 0
     tester.advance_cycle()
     tester.circuit.b = 0
     tester.advance_cycle()
 
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.a = 0
@@ -476,22 +494,19 @@ def test_until_with(sva, capsys):
     tester.advance_cycle()
 
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+    _assert_failed(out, "sva", "dsl")
 
 
 @requires_ncsim
-@pytest.mark.parametrize("sva", [True, False])
-def test_inside(sva, capsys):
+def test_inside(capsys, tmp_path):
     class Main(m.Circuit):
         io = m.IO(a=m.In(m.Bits[2])) + m.ClockIO()
-        if sva:
-            f.assert_(f.sva(io.a, "inside {0, 1}"), on=f.posedge(io.CLK))
-        else:
-            f.assert_(io.a | f.inside | {0, 1}, on=f.posedge(io.CLK))
+        f.assert_(f.sva(io.a, "inside {0, 1}"), on=f.posedge(io.CLK),
+                  name="sva")
+        f.assert_(io.a | f.inside | {0, 1}, on=f.posedge(io.CLK),
+                  name="dsl")
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.a = 0
@@ -499,24 +514,20 @@ def test_inside(sva, capsys):
     tester.circuit.a = 1
     tester.advance_cycle()
 
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.a = 2
     tester.advance_cycle()
 
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
     out, _ = capsys.readouterr()
-    assert "Assertion Main_tb.dut.__assert_1 has failed" in out
+    _assert_failed(out, "sva", "dsl")
 
 
 @requires_ncsim
-def test_disable_if():
+def test_disable_if(tmp_path):
     class Main(m.Circuit):
         io = m.IO(a=m.In(m.Bit), b=m.In(m.Bit))
         io += m.ClockIO(has_resetn=True)
@@ -532,9 +543,7 @@ def test_disable_if():
     tester.advance_cycle()
     tester.circuit.b = 1
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.RESETN = 1
     tester.circuit.a = 1
@@ -543,9 +552,7 @@ def test_disable_if():
     tester.advance_cycle()
     tester.circuit.RESETN = 0
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
 
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.RESETN = 1
@@ -555,15 +562,13 @@ def test_disable_if():
     tester.advance_cycle()
     tester.advance_cycle()
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True}, flags=["-sv"],
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path)
 
 
 @requires_ncsim
 @pytest.mark.parametrize('compile_guard', ["ASSERT_ON",
                                            ["ASSERT_ON", "FORMAL_ON"]])
-def test_ifdef_and_name(capsys, compile_guard):
+def test_ifdef_and_name(capsys, compile_guard, tmp_path):
     class Main(m.Circuit):
         io = m.IO(a=m.In(m.Bit), b=m.In(m.Bit))
         io += m.ClockIO(has_resetn=True)
@@ -584,25 +589,21 @@ def test_ifdef_and_name(capsys, compile_guard):
     tester.advance_cycle()
     tester.advance_cycle()
     # Should not fail with no ASSERT_ON
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_opts={"sv": True}, flags=["-sv"],
-                           magma_output="mlir-verilog")
+    _run(tester, tmp_path)
     # Should fail
     with pytest.raises(AssertionError):
         if isinstance(compile_guard, str):
             compile_guard = [compile_guard]
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               flags=["-sv"] +
-                               [f"+define+{guard}" for guard in compile_guard],
-                               magma_opts={"sv": True},
-                               magma_output="mlir-verilog")
+        _run(tester, tmp_path,
+             flags=["-sv"] +
+             [f"+define+{guard}" for guard in compile_guard])
     out, _ = capsys.readouterr()
     assert "Assertion Main_tb.dut.foo has failed" in out
     assert "Assertion Main_tb.dut.bar has failed" in out
 
 
 @requires_ncsim
-def test_default_clock_function():
+def test_default_clock_function(tmp_path):
     def my_assert(property, on=None, disable_iff=None):
         # If needed, create undriven clock/reset temporaries, will be driven by
         # automatic clock wiring logic
@@ -636,17 +637,16 @@ def test_default_clock_function():
     tester.advance_cycle()
     tester.circuit.O.expect(0)
 
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_output="mlir-verilog", flags=["-sv"],
-                           magma_opts={"drive_undriven": True,
-                                       "disable_initial_blocks": True,
-                                       "sv": True,
-                                       "terminate_unused": True,
-                                       "flatten_all_tuples": True})
+    _run(tester, tmp_path,
+         magma_opts={"drive_undriven": True,
+                     "disable_initial_blocks": True,
+                     "sv": True,
+                     "terminate_unused": True,
+                     "flatten_all_tuples": True})
 
 
 @requires_ncsim
-def test_cover(capsys):
+def test_cover(capsys, tmp_path):
     class Main(m.Circuit):
         io = m.IO(I=m.In(m.Bit), O=m.Out(m.Bit)) + m.ClockIO()
         io.O @= m.Register(T=m.Bit)()(io.I)
@@ -656,11 +656,9 @@ def test_cover(capsys):
     tester.advance_cycle()
     tester.circuit.I = 1
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           flags=["-sv"], magma_output="mlir-verilog",
-                           magma_opts={"sv": True,
-                                       "disable_initial_blocks": True},
-                           disp_type="realtime", coverage=True)
+    _run(tester, tmp_path,
+         magma_opts={"sv": True, "disable_initial_blocks": True},
+         disp_type="realtime", coverage=True)
 
     out, _ = capsys.readouterr()
     # not covered
@@ -672,11 +670,9 @@ def test_cover(capsys):
     tester.circuit.I = 1
     tester.advance_cycle()
     tester.circuit.I = 0
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           flags=["-sv"], magma_output="mlir-verilog",
-                           magma_opts={"sv": True,
-                                       "disable_initial_blocks": True},
-                           disp_type="realtime", coverage=True)
+    _run(tester, tmp_path,
+         magma_opts={"sv": True, "disable_initial_blocks": True},
+         disp_type="realtime", coverage=True)
 
     out, _ = capsys.readouterr()
     # covered
@@ -688,7 +684,7 @@ def test_cover(capsys):
 
 
 @requires_ncsim
-def test_assume(capsys):
+def test_assume(capsys, tmp_path):
     class Main(m.Circuit):
         io = m.IO(I=m.In(m.Bit), O=m.Out(m.Bit)) + m.ClockIO()
         io.O @= m.Register(T=m.Bit)()(io.I)
@@ -701,15 +697,13 @@ def test_assume(capsys):
     # assume behaves like assert in simulation (but used as an assumption for
     # formal tools)
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               magma_opts={"sv": True,
-                                           "disable_initial_blocks": True},
-                               flags=["-sv"], magma_output="mlir-verilog")
+        _run(tester, tmp_path,
+             magma_opts={"sv": True, "disable_initial_blocks": True})
 
 
 @requires_ncsim
 @pytest.mark.parametrize('use_sva', [False, True])
-def test_not_onehot(use_sva):
+def test_not_onehot(use_sva, tmp_path):
     class Main(m.Circuit):
         io = m.IO(I=m.In(m.Bits[8]), x=m.In(m.Bit)) + m.ClockIO()
         if use_sva:
@@ -729,11 +723,10 @@ def test_not_onehot(use_sva):
     tester.circuit.x = False
     tester.step(2)
 
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_output="mlir-verilog", flags=["-sv"],
-                           magma_opts={"drive_undriven": True,
-                                       "sv": True,
-                                       "terminate_unused": True})
+    _run(tester, tmp_path,
+         magma_opts={"drive_undriven": True,
+                     "sv": True,
+                     "terminate_unused": True})
 
     tester.circuit.I = 0xFF
     tester.step(2)
@@ -741,17 +734,16 @@ def test_not_onehot(use_sva):
     tester.step(2)
 
     with pytest.raises(AssertionError):
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               flags=["-sv"], magma_output="mlir-verilog",
-                               magma_opts={"drive_undriven": True,
-                                           "sv": True,
-                                           "terminate_unused": True})
+        _run(tester, tmp_path,
+             magma_opts={"drive_undriven": True,
+                         "sv": True,
+                         "terminate_unused": True})
 
 
 @requires_ncsim
 @pytest.mark.parametrize('use_sva', [True, False])
 @pytest.mark.parametrize('should_pass', [True, False])
-def test_advanced_property_example_1(use_sva, should_pass):
+def test_advanced_property_example_1(use_sva, should_pass, tmp_path):
     class Foo(m.Circuit):
         io = m.IO(a=m.In(m.Bits[8]), b=m.In(m.Bits[8]), c=m.In(m.Bits[8]),
                   x=m.Out(m.Bits[8]), y=m.Out(m.Bits[8]))
@@ -798,21 +790,18 @@ def test_advanced_property_example_1(use_sva, should_pass):
     tester.step(2)
     tester.step(2)
     try:
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               flags=["-sv"], magma_output="mlir-verilog",
-                               magma_opts={"drive_undriven": True,
-                                           "disable_initial_blocks": True,
-                                           "sv": True,
-                                           "terminate_unused": True})
+        _run(tester, tmp_path,
+             magma_opts={"drive_undriven": True,
+                         "disable_initial_blocks": True,
+                         "sv": True,
+                         "terminate_unused": True})
         assert should_pass
     except AssertionError:
         assert not should_pass
 
 
-@requires_ncsim
-@pytest.mark.parametrize('use_sva', [True, False])
-@pytest.mark.parametrize('should_pass', [True, False])
-def test_advanced_property_example_2(use_sva, should_pass):
+@lru_cache(maxsize=None)
+def _make_advanced_property_example_2_foo(use_sva):
     class Foo(m.Circuit):
         io = m.IO(valid=m.In(m.Bit), sop=m.In(m.Bit), eop=m.In(m.Bit),
                   ready=m.Out(m.Bit)) + m.ClockIO(has_resetn=True)
@@ -855,7 +844,14 @@ def test_advanced_property_example_2(use_sva, should_pass):
                 on=f.posedge(io.CLK),
                 disable_iff=f.not_(io.RESETN)
             )
+    return Foo
+
 
+@requires_ncsim
+@pytest.mark.parametrize('use_sva', [True, False])
+@pytest.mark.parametrize('should_pass', [True, False])
+def test_advanced_property_example_2(use_sva, should_pass, tmp_path):
+    Foo = _make_advanced_property_example_2_foo(use_sva)
     tester = f.Tester(Foo, Foo.CLK)
     tester.circuit.RESETN = 1
     tester.circuit.valid = 1
@@ -866,12 +862,11 @@ def test_advanced_property_example_2(use_sva, should_pass):
         tester.circuit.sop = 0
     tester.step(2)
     try:
-        tester.compile_and_run("system-verilog", simulator="ncsim",
-                               flags=["-sv"], magma_output="mlir-verilog",
-                               magma_opts={"drive_undriven": True,
-                                           "sv": True,
-                                           "disable_initial_blocks": True,
-                                           "terminate_unused": True})
+        _run(tester, tmp_path,
+             magma_opts={"drive_undriven": True,
+                         "sv": True,
+                         "disable_initial_blocks": True,
+                         "terminate_unused": True})
     except AssertionError:
         assert not should_pass
     else:
@@ -879,7 +874,7 @@ def test_advanced_property_example_2(use_sva, should_pass):
 
 
 @requires_ncsim
-def test_cover_when(capsys):
+def test_cover_when(capsys, tmp_path):
     class Main(m.Circuit):
         io = m.IO(I=m.In(m.Bit), S=m.In(m.Bit), O=m.Out(m.Bit)) + m.ClockIO()
         io.O @= m.Register(T=m.Bit)()(io.I)
@@ -893,14 +888,9 @@ def test_cover_when(capsys):
     tester.advance_cycle()
     tester.circuit.I = 1
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog",
-                           simulator="ncsim",
-                           magma_output="mlir-verilog",
-                           flags=["-sv"],
-                           magma_opts={"sv": True,
-                                       "disable_initial_blocks": True},
-                           disp_type="realtime",
-                           coverage=True)
+    _run(tester, tmp_path,
+         magma_opts={"sv": True, "disable_initial_blocks": True},
+         disp_type="realtime", coverage=True)
 
     out, _ = capsys.readouterr()
     assert """\
@@ -916,12 +906,9 @@ def test_cover_when(capsys):
     tester.advance_cycle()
     tester.circuit.I = 0
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           magma_output="mlir-verilog", flags=["-sv"],
-                           skip_compile=True, disp_type="realtime",
-                           magma_opts={"sv": True,
-                                       "disable_initial_blocks": True},
-                           coverage=True)
+    _run(tester, tmp_path, skip_compile=True, disp_type="realtime",
+         magma_opts={"sv": True, "disable_initial_blocks": True},
+         coverage=True)
 
     out, _ = capsys.readouterr()
     assert """\
@@ -937,11 +924,9 @@ def test_cover_when(capsys):
     tester.advance_cycle()
     tester.circuit.I = 0
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           flags=["-sv"], skip_compile=True,
-                           magma_opts={"sv": True,
-                                       "disable_initial_blocks": True},
-                           disp_type="realtime", coverage=True)
+    _run(tester, tmp_path, skip_compile=True,
+         magma_opts={"sv": True, "disable_initial_blocks": True},
+         disp_type="realtime", coverage=True)
 
     out, _ = capsys.readouterr()
     assert """\
@@ -957,15 +942,9 @@ def test_cover_when(capsys):
     tester.advance_cycle()
     tester.circuit.I = 0
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog",
-                           simulator="ncsim",
-                           magma_output="mlir-verilog",
-                           flags=["-sv"],
-                           skip_compile=True,
-                           disp_type="realtime",
-                           magma_opts={"sv": True,
-                                       "disable_initial_blocks": True},
-                           coverage=True)
+    _run(tester, tmp_path, skip_compile=True, disp_type="realtime",
+         magma_opts={"sv": True, "disable_initial_blocks": True},
+         coverage=True)
 
     out, _ = capsys.readouterr()
     # covered
@@ -978,7 +957,7 @@ def test_cover_when(capsys):
 
 
 @requires_ncsim
-def test_cover_when_true(capsys):
+def test_cover_when_true(capsys, tmp_path):
     class Main(m.Circuit):
         io = m.IO(
             I=m.In(m.Bit), J=m.In(m.Bit), S=m.In(m.Bit), O=m.Out(m.Bit)
@@ -991,14 +970,9 @@ def test_cover_when_true(capsys):
     tester = f.SynchronousTester(Main, Main.CLK)
     tester.circuit.S = 0
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog",
-                           simulator="ncsim",
-                           magma_output="mlir-verilog",
-                           flags=["-sv"],
-                           magma_opts={"sv": True,
-                                       "disable_initial_blocks": True},
-                           disp_type="realtime",
-                           coverage=True)
+    _run(tester, tmp_path,
+         magma_opts={"sv": True, "disable_initial_blocks": True},
+         disp_type="realtime", coverage=True)
 
     out, _ = capsys.readouterr()
     assert """\
@@ -1011,11 +985,9 @@ def test_cover_when_true(capsys):
     tester.circuit.CLK = 0
     tester.circuit.S = 1
     tester.advance_cycle()
-    tester.compile_and_run("system-verilog", simulator="ncsim",
-                           flags=["-sv"], skip_compile=True,
-                           magma_opts={"sv": True,
-                                       "disable_initial_blocks": True},
-                           disp_type="realtime", coverage=True)
+    _run(tester, tmp_path, skip_compile=True,
+         magma_opts={"sv": True, "disable_initial_blocks": True},
+         disp_type="realtime", coverage=True)
 
     out, _ = capsys.readouterr()
     assert """\
@@ -1,4 +1,4 @@
-from fault.pwl import pwc_to_pwl
+from fault.pwl import pwc_to_pwl, pwc_to_pwl_vec, pwl_str
 from math import isclose
 
 
@@ -18,3 +18,41 @@ def test_spice_target_pwl(t_tr=0.2e-9, t_stop=20e-9):
 
     run_test([(0, 1.2), (10e-9, 3.4), (15e-9, 5.6)],
              [(0, 1.2), (10e-9, 1.2), (10.2e-9, 3.4), (15e-9, 3.4), (15.2e-9, 5.6), (20e-9, 5.6)])  # noqa
+
+
+def test_spice_target_pwl_vec(t_tr=0.2e-9, t_stop=20e-9):
+    def run_test(stim, init=0):
+        t_arr = [t for t, _ in stim]
+        v_arr = [v for _, v in stim]
+        meas = pwc_to_pwl_vec(t_arr, v_arr, t_stop, t_tr=t_tr, init=init)
+        expct = pwc_to_pwl(stim, t_stop, t_tr=t_tr, init=init)
+        assert len(meas) == len(expct)
+        check_pwl_result(meas=meas, expct=expct)
+
+    run_test([(1e-9, 1.2), (10e-9, 3.4), (15e-9, 5.6)])
+    run_test([(0, 1.2), (10e-9, 3.4), (15e-9, 5.6)])
+    run_test([(2e-9, 1), (4e-9, 0)], init=1)
+    run_test([])
+
+
+def test_pwl_str(t_tr=0.2e-9, t_stop=20e-9):
+    stim = [(1e-9, 1.2), (10e-9, 3.4)]
+    t_arr = [t for t, _ in stim]
+    v_arr = [v for _, v in stim]
+
+    # the list and array forms should describe the same waveform
+    meas = pwl_str(pwc_to_pwl_vec(t_arr, v_arr, t_stop, t_tr=t_tr))
+    expct = pwl_str(pwc_to_pwl(stim, t_stop, t_tr=t_tr))
+    meas = [float(tok) for tok in meas.split()]
+    expct = [float(tok) for tok in expct.split()]
+    assert len(meas) == len(expct)
+    for a, b in zip(meas, expct):
+        assert isclose(a, b), f'Mismatch: {a} vs {b}'
+
+
+def test_pwl_str_round_trip():
+    # values written to the netlist should parse back to the same floats
+    pwl = pwc_to_pwl_vec([1e-9 / 3, 4e-9 / 3], [0.1 + 0.2, 1 / 7], 1e-8,
+                         2e-10)
+    vals = [float(tok) for tok in pwl_str(pwl).split()]
+    assert vals == pwl.ravel().tolist()
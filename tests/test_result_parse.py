@@ -0,0 +1,109 @@
+import os
+import pytest
+from fault.result_parse import (SpiceResult, CSDFData, cached_parse,
+                                eval_results)
+from fault.spice_target import parse_results
+
+
+def test_cached_parse(tmp_path):
+    raw_file = tmp_path / 'out.raw'
+    raw_file.write_text('0 1\n1 3\n')
+
+    calls = []
+
+    def parse_func(file_name):
+        calls.append(file_name)
+        t, v = zip(*(map(float, line.split())
+                     for line in open(file_name).read().splitlines()))
+        return {'out': SpiceResult(t=list(t), v=list(v))}
+
+    # the first parse reads the raw file, the second uses the cache
+    results_1 = cached_parse(parse_func, raw_file)
+    results_2 = cached_parse(parse_func, raw_file)
+    assert len(calls) == 1
+    assert (tmp_path / 'out.raw.pkl').exists()
+    assert results_1['out'](0.5) == 2
+    assert results_2['out'](0.5) == 2
+
+    # changing the raw file invalidates the cache
+    raw_file.write_text('0 1\n1 5\n')
+    stat = raw_file.stat()
+    os.utime(raw_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    results_3 = cached_parse(parse_func, raw_file)
+    assert len(calls) == 2
+    assert results_3['out'](0.5) == 3
+
+    # results cached by a different parser are not reused
+    def other_parse_func(file_name):
+        return parse_func(file_name)
+
+    cached_parse(other_parse_func, raw_file)
+    assert len(calls) == 3
+
+
+def test_parse_results_cache(tmp_path):
+    tr0_file = tmp_path / 'out.tr0'
+    tr0_file.write_bytes(b"#N 'v(a)'\n#C 0.0 1\n1.0\n#C 1.0e-9 1\n2.0\n#;\n")
+
+    # results are only cached when asked for
+    results = parse_results('hspice', tr0_file)
+    assert results['a'](0.5e-9) == 1.5
+    assert not (tmp_path / 'out.tr0.pkl').exists()
+    results = parse_results('hspice', tr0_file, cache=True)
+    assert results['a'](0.5e-9) == 1.5
+    assert (tmp_path / 'out.tr0.pkl').exists()
+
+
+def test_csdf_parse():
+    text = b'''\
+#H
+SOURCE='HSPICE' VERSION='test'
+#N 'v(a)' 'v(b)'
+#C 0.0 2
+1.0 2.0
+#C 1.0e-9 2 3.0
+4.0
+#;
+'''
+    data = CSDFData()
+    data.parse(text.splitlines())
+    assert data.names() == ['time', 'v(a)', 'v(b)']
+    assert list(data.get('time')) == [0.0, 1e-9]
+    assert list(data.get('v(a)')) == [1.0, 3.0]
+    assert list(data.get('v(b)')) == [2.0, 4.0]
+
+
+def test_csdf_read(tmp_path):
+    tr0_file = tmp_path / 'out.tr0'
+    tr0_file.write_bytes(b"#N 'v(a)'\n#C 0.0 1\n1.0\n#C 1.0e-9 1\n2.0\n#;\n")
+    data = CSDFData()
+    data.read(tr0_file)
+    assert list(data.get('v(a)')) == [1.0, 2.0]
+
+    # an empty file has no data points
+    tr0_file.write_bytes(b'')
+    data = CSDFData()
+    data.read(tr0_file)
+    assert len(data.get('time')) == 0
+
+
+@pytest.mark.parametrize('text', [
+    # cut off after the time of a data point
+    b"#N 'v(a)'\n#C 0.0 1\n1.0\n#C 1.0e-9",
+    # cut off before all of the values of a data point
+    b"#N 'v(a)' 'v(b)'\n#C 0.0 2\n1.0 2.0\n#C 1.0e-9 2 3.0",
+])
+def test_csdf_parse_truncated(text):
+    with pytest.raises(ValueError, match='truncated'):
+        CSDFData().parse(text.splitlines())
+
+
+def test_eval_results():
+    results = {
+        'a': SpiceResult(t=[0, 1], v=[0, 2]),
+        'b': SpiceResult(t=[0, 1], v=[5, 3])
+    }
+    # values are returned in the order of the lookups, with repeated and
+    # interleaved names
+    values = eval_results(results, ['a', 'b', 'a', 'b'], [0.5, 0.5, 0.25, 2])
+    assert list(values) == [1, 4, 0.5, 3]
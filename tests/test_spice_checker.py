@@ -0,0 +1,37 @@
+import pytest
+import magma as m
+import fault
+from fault.actions import Expect
+from fault.fault_errors import A2DError, ExpectError
+from fault.spice_target import SpiceTarget
+
+
+def test_spice_checker(tmp_path):
+    class circ(m.Circuit):
+        name = 's'
+        io = m.IO(
+            a=m.BitOut,
+            b=fault.RealOut
+        )
+
+    target = SpiceTarget(circ, directory=tmp_path, conn_order='alpha')
+
+    # digital check, using the logic level
+    checker = target.make_checker(Expect(circ.a, 1))
+    checker(0, 1.2, 1)
+    with pytest.raises(ExpectError):
+        checker(0, 0.1, 0)
+    with pytest.raises(A2DError):
+        checker(0, 0.6, -1)
+
+    # analog range check, using the measured value
+    checker = target.make_checker(Expect(circ.b, 0.5, abs_tol=0.1))
+    checker(0, 0.55, 1)
+    with pytest.raises(ExpectError):
+        checker(0, 0.65, 1)
+
+    # analog lower bound
+    checker = target.make_checker(Expect(circ.b, None, above=0.5))
+    checker(0, 0.6, 0)
+    with pytest.raises(ExpectError):
+        checker(0, 0.4, 0)
@@ -0,0 +1,50 @@
+import magma as m
+import fault
+from pathlib import Path
+from fault.spice_target import SpiceTarget
+from .common import pytest_sim_params
+
+
+def pytest_generate_tests(metafunc):
+    pytest_sim_params(metafunc, 'spice')
+
+
+def test_spice_run_many(target, simulator, tmp_path, vsup=1.5):
+    # declare circuit
+    class myinv(m.Circuit):
+        io = m.IO(
+            in_=fault.RealIn,
+            out=fault.RealOut,
+            vdd=fault.RealIn,
+            vss=fault.RealIn
+        )
+
+    # define one test per input value
+    actions_list = []
+    gets_list = []
+    for in_ in [0, vsup]:
+        tester = fault.Tester(myinv)
+        tester.poke(myinv.vdd, vsup)
+        tester.poke(myinv.vss, 0)
+        tester.poke(myinv.in_, in_)
+        tester.eval()
+        gets_list.append(tester.get_value(myinv.out))
+        actions_list.append(tester.actions)
+
+    # run the tests in parallel
+    spice_target = SpiceTarget(
+        myinv,
+        directory=tmp_path,
+        simulator=simulator,
+        model_paths=[Path('tests/spice/myinv.sp').resolve()],
+        vsup=vsup
+    )
+    spice_target.run_many(actions_list, max_workers=2)
+
+    # each test should have been written to its own directory
+    assert (tmp_path / 'run_0').is_dir()
+    assert (tmp_path / 'run_1').is_dir()
+
+    # results should be processed in the same order as the tests
+    assert gets_list[0].value > 0.9 * vsup
+    assert gets_list[1].value < 0.1 * vsup
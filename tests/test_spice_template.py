@@ -0,0 +1,79 @@
+import magma as m
+import fault
+from fault.spice_target import SpiceTarget
+
+
+def test_spice_template(tmp_path):
+    class circ(m.Circuit):
+        name = 's'
+        io = m.IO(
+            a=m.BitIn,
+            b=fault.RealIn,
+            c=m.BitOut
+        )
+
+    def write_tb(b_val):
+        tester = fault.Tester(circ)
+        tester.poke(circ.a, 1)
+        tester.poke(circ.b, b_val)
+        tester.expect(circ.c, 0)
+        comp = target.compile_actions(tester.actions)
+        return target.write_test_bench(comp).read_text()
+
+    # write two testbenches that only differ in their stimulus values
+    target = SpiceTarget(circ, directory=tmp_path, conn_order='alpha')
+    tb_1 = write_tb(1.23)
+    tb_2 = write_tb(4.56)
+
+    # the template should have been saved to disk once, with no temporary
+    # files left behind
+    assert len(list(tmp_path.glob('tb_*.sp.tmpl'))) == 1
+    assert len(list(tmp_path.glob('*.tmp'))) == 0
+
+    # check that the stimulus values were filled in
+    assert 'PWL(0 0 5e-09 0 5.2e-09 1.23 1e-08 1.23)' in tb_1
+    assert 'PWL(0 0 5e-09 0 5.2e-09 4.56 1e-08 4.56)' in tb_2
+    assert '{' not in tb_1 and '}' not in tb_1
+    assert tb_1.replace('1.23', '4.56') == tb_2
+
+    # later testbenches reuse the template kept in memory
+    for template_file in tmp_path.glob('tb_*.sp.tmpl'):
+        template_file.unlink()
+    assert write_tb(1.23) == tb_1
+    assert len(list(tmp_path.glob('tb_*.sp.tmpl'))) == 0
+
+
+def test_spice_template_key_resolves_paths(tmp_path, monkeypatch):
+    class circ(m.Circuit):
+        name = 's'
+        io = m.IO(a=m.BitIn)
+
+    tester = fault.Tester(circ)
+    tester.poke(circ.a, 1)
+
+    # the same model file given by relative and absolute paths should
+    # share a template
+    monkeypatch.chdir(tmp_path)
+    keys = []
+    for path in ['model.sp', tmp_path / 'model.sp']:
+        target = SpiceTarget(circ, directory=tmp_path, conn_order='alpha',
+                             model_paths=[path])
+        comp = target.compile_actions(tester.actions)
+        keys.append(target.tb_structural_key(comp))
+    assert keys[0] == keys[1]
+
+
+def test_spice_delay_only(tmp_path):
+    class circ(m.Circuit):
+        name = 's'
+        io = m.IO(a=m.BitIn, b=m.BitOut)
+
+    # a test with only delays has no stimulus and just runs for the total
+    # delay
+    tester = fault.Tester(circ)
+    tester.delay(1e-9)
+    tester.delay(2.5e-9)
+    target = SpiceTarget(circ, directory=tmp_path, conn_order='alpha')
+    comp = target.compile_actions(tester.actions)
+    assert comp.pwls == {}
+    assert comp.stop_time == 3.5e-9
@@ -35,19 +35,6 @@ def test_call_interface_kwargs(target, simulator):
                                    magma_opts={"sv": True})
 
 
-def test_call_interface_kwargs(target, simulator):
-    tester = fault.Tester(AndCircuit)
-    for i, j in zip(range(2), range(2)):
-        tester(i, j, I0=0).expect(0)
-    with tempfile.TemporaryDirectory(dir=".") as _dir:
-        if target == "verilator":
-            tester.compile_and_run(target, directory=_dir)
-        else:
-            tester.compile_and_run(target, directory=_dir,
-                                   simulator=simulator,
-                                   magma_opts={"sv": True})
-
-
 def test_call_interface_clock(target, simulator, caplog):
     ops = [operator.add, operator.sub, operator.mul, lambda x, y: y - x]
     tester = fault.Tester(SimpleALU, SimpleALU.CLK)
@@ -3,6 +3,7 @@ import magma as m
 import random
 from hwtypes import BitVector, SIntVector
 import hwtypes
+import numpy as np
 import fault
 from fault.actions import Poke, Expect, Eval, Step, Print, Peek
 import fault.actions as actions
@@ -1063,3 +1064,23 @@ def test_tester_array2_slice(target, simulator):
         else:
             tester.compile_and_run(target, directory=_dir, simulator=simulator,
                                    magma_opts={"sv": True})
+
+
+def test_tester_nested_arrays_numpy():
+    circ = TestDoubleNestedArraysCircuit
+    tester = fault.Tester(circ)
+    val = np.array([[1, 2, 3], [4, 5, 6]])
+    tester.poke(circ.I, val)
+    tester.eval()
+    tester.expect(circ.O, val)
+    expected = []
+    for j in range(2):
+        for i in range(3):
+            expected.append(Poke(circ.I[j][i], int(val[j][i])))
+    expected.append(Eval())
+    for j in range(2):
+        for i in range(3):
+            expected.append(Expect(circ.O[j][i], int(val[j][i])))
+    assert len(tester.actions) == len(expected)
+    for i, exp in enumerate(expected):
+        check(tester.actions[i], exp)
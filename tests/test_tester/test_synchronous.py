@@ -73,3 +73,11 @@ def test_find_default_clock_nested_multiple():
     with pytest.raises(ValueError) as e:
         SynchronousTester(Foo)
     assert str(e.value) == "SynchronousTester requires a clock"
+
+
+def test_advance_cycles():
+    tester = SynchronousTester(SimpleALU, SimpleALU.CLK)
+    tester.advance_cycles(3)
+    # initial clock poke followed by a single step for all three cycles
+    assert len(tester.actions) == 2
+    assert tester.actions[-1].steps == 6